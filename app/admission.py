@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Tuple
+
+from app.config import settings
+from app.metrics import admission_in_flight, admission_queued, admission_rejected, admission_limits
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted; `reason` is "queue_full" or "queue_timeout".
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """
+    Admits at most `limit` concurrent requests and lets at most `max_queue` more wait, each for at
+    most `timeout` seconds. Anything beyond that is rejected at once instead of piling up on the
+    connection pool or the password hasher. Freed slots are handed to waiters in arrival order.
+    """
+
+    def __init__(self, route: str, limit: int, max_queue: int, timeout: float):
+        """
+        Args:
+            route (str): ``METHOD /path/template`` the limiter guards, used as the metrics label.
+            limit (int): Number of requests served at once.
+            max_queue (int): Number of requests allowed to wait for a slot.
+            timeout (float): Seconds a request may wait before it is rejected.
+        """
+        self.route = route
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._in_flight = admission_in_flight.labels(route)
+        self._queued = admission_queued.labels(route)
+        admission_limits.labels(route, "concurrency").set(limit)
+        admission_limits.labels(route, "queue").set(max_queue)
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._in_flight.inc()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued.inc()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            # release() may hand the slot over in the same loop iteration the timeout fires;
+            # the slot is then ours, and rejecting would leak it
+            if waiter.done() and not waiter.cancelled():
+                return
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self._queued.dec()
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+    def release(self) -> None:
+        """
+        Free a slot, handing it straight to the oldest waiter if there is one.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+        self._in_flight.dec()
+
+    def _reject(self, reason: str) -> None:
+        admission_rejected.labels(self.route, reason).inc()
+        raise AdmissionRejected(reason)
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets: each client may make `burst` requests at once and then `rate`
+    requests per second. Buckets of the least recently seen clients are dropped beyond `max_clients`.
+    """
+
+    def __init__(self, route: str, rate: float, burst: int, max_clients: int = 100000):
+        """
+        Args:
+            route (str): ``METHOD /path/template`` the limiter guards, used as the metrics label.
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity.
+            max_clients (int): Number of client buckets kept.
+        """
+        self.route = route
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        admission_limits.labels(route, "rate_per_second").set(rate)
+        admission_limits.labels(route, "burst").set(burst)
+
+    def take(self, client: str) -> float:
+        """
+        Take a token for the client.
+        Args:
+            client (str): Client identifier, e.g. its IP address
+        Returns:
+            float: 0 if the request may proceed, otherwise the seconds until a token is available
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+            admission_rejected.labels(self.route, "rate_limited").inc()
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def concurrency_limiters() -> Dict[str, ConcurrencyLimiter]:
+    """
+    Build the per-route concurrency limiters configured in settings, keyed by ``METHOD /path/template``.
+    """
+    return {
+        route: ConcurrencyLimiter(
+            route,
+            limit=limit,
+            max_queue=settings.ADMISSION_ROUTE_QUEUES.get(route, settings.ADMISSION_QUEUE_SIZE),
+            timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+        for route, limit in settings.ADMISSION_ROUTE_LIMITS.items()
+        if limit > 0
+    }
+
+
+def rate_limiters() -> Dict[str, TokenBucketLimiter]:
+    """
+    Build the per-client token buckets for the routes in RATE_LIMITED_ROUTES.
+    """
+    if settings.AUTH_RATE_LIMIT_PER_MINUTE <= 0:
+        return {}
+    return {
+        route: TokenBucketLimiter(route, rate=settings.AUTH_RATE_LIMIT_PER_MINUTE / 60,
+                                  burst=settings.AUTH_RATE_LIMIT_BURST)
+        for route in settings.RATE_LIMITED_ROUTES
+    }
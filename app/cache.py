@@ -1,16 +1,146 @@
-from datetime import datetime, timedelta, UTC
-from typing import Dict, Any, Optional
+import asyncio
+import heapq
+import logging
+import pickle
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from app.config import settings
 
-class SimpleCache:
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Roughly estimates the memory footprint of a cached value in bytes.
+
+    Containers and plain objects (including pydantic models) are walked a few levels deep;
+    this is an approximation meant for enforcing a byte budget, not an exact measurement.
+
+    Args:
+        value (Any): The value to measure.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _depth + 1)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "seq", "tags")
+
+    def __init__(self, value: Any, expires_at: float, size: int, seq: int, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.seq = seq
+        self.tags = tags
+
+
+class CacheBackend(ABC):
     """
-    Simple in-memory cache.
+    Interface shared by all cache backends.
     """
 
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    async def start(self) -> None:
+        """
+        Starts background work such as invalidation listeners. Called from the app lifespan.
+        """
 
-    async def set(self, key: str, value: Any, expiry_seconds: int) -> None:
+    async def close(self) -> None:
+        """
+        Stops background work and releases connections. Called from the app lifespan.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, expiry_seconds: int, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def invalidate_tag(self, tag: str) -> int:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        ...
+
+
+class TTLCache(CacheBackend):
+    """
+    Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+    Entries are kept in an OrderedDict in least-recently-used order. Expiry deadlines are
+    tracked in a min-heap, so expired entries are removed a few at a time on every call
+    without scanning the whole cache.
+
+    Entries can carry tags (e.g. ``user:42``); a reverse index from tag to keys lets
+    `invalidate_tag` drop every entry under a tag in time proportional to those entries.
+    """
+
+    SWEEP_STEPS = 16  # expired entries removed per get/set call at most
+
+    def __init__(
+            self,
+            max_entries: int = 10000,
+            max_bytes: int = 64 * 1024 * 1024,
+            clock: Callable[[], float] = time.monotonic,
+            sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept in the cache.
+            max_bytes (int): Maximum estimated size of all cached values in bytes.
+            clock (Callable[[], float]): Monotonic clock returning seconds.
+            sizeof (Callable[[Any], int]): Function estimating the size of a value in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sizeof = sizeof
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._deadlines: List[Tuple[float, int, str]] = []
+        self._tags: Dict[str, Set[str]] = {}
+        self._seq = count()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    async def set(self, key: str, value: Any, expiry_seconds: int, tags: Iterable[str] = ()) -> None:
         """
         Sets a key-value pair in the cache with an expiry time.
 
@@ -18,12 +148,34 @@ class SimpleCache:
             key (str): The key to store in the cache.
             value (Any): The value to store.
             expiry_seconds (int): The number of seconds after which the cache entry expires.
+            tags (Iterable[str]): Tags the entry can later be invalidated by.
         """
-        expiry = datetime.now(UTC) + timedelta(seconds=expiry_seconds)
-        self._cache[key] = {
-            "value": value,
-            "expiry": expiry
-        }
+        now = self._clock()
+        self._sweep(now, self.SWEEP_STEPS)
+
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            self._remove(key)
+            return
+
+        self._remove(key)
+        seq = next(self._seq)
+        expires_at = now + expiry_seconds
+        tags = tuple(tags)
+        self._cache[key] = _Entry(value, expires_at, size, seq, tags)
+        self._bytes += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        heapq.heappush(self._deadlines, (expires_at, seq, key))
+
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            evicted_key, entry = self._cache.popitem(last=False)
+            self._unlink(evicted_key, entry)
+            self.evictions += 1
+
+        # Drop heap records of overwritten/evicted entries once they dominate the heap
+        if len(self._deadlines) > 2 * len(self._cache) + 64:
+            self._compact()
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -35,15 +187,22 @@ class SimpleCache:
         Returns:
             Optional[Any]: The cached value if it exists and is not expired; otherwise, None.
         """
-        if key not in self._cache:
-            return None
+        now = self._clock()
+        self._sweep(now, self.SWEEP_STEPS)
 
-        cached_item = self._cache[key]
-        if cached_item["expiry"] < datetime.now(UTC):
-            del self._cache[key]
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
             return None
 
-        return cached_item["value"]
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return entry.value
 
     async def delete(self, key: str) -> bool:
         """
@@ -55,25 +214,343 @@ class SimpleCache:
         Returns:
             bool: True if the key was deleted, False if the key was not found.
         """
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        return self._remove(key)
 
-    async def delete_pattern(self, pattern: str) -> int:
+    async def invalidate_tag(self, tag: str) -> int:
         """
-        Deletes all key-value pairs whose keys match the given pattern.
+        Deletes all key-value pairs stored under the given tag.
 
         Args:
-            pattern (str): A string pattern to match within the keys.
+            tag (str): The tag to invalidate, e.g. ``user:42``.
 
         Returns:
             int: The number of keys deleted.
         """
-        keys_to_delete = [k for k in self._cache.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self._cache[key]
-        return len(keys_to_delete)
+        keys = self._tags.pop(tag, None)
+        if not keys:
+            return 0
+        deleted = 0
+        for key in keys:
+            deleted += self._remove(key)
+        return deleted
+
+    async def clear(self) -> None:
+        """
+        Removes every entry from the cache. Counters are kept.
+        """
+        self._cache.clear()
+        self._deadlines.clear()
+        self._tags.clear()
+        self._bytes = 0
+
+    def sweep(self) -> int:
+        """
+        Removes all entries whose expiry time has passed.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        return self._sweep(self._clock(), None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters and current occupancy.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+        }
+
+    def _sweep(self, now: float, limit: Optional[int]) -> int:
+        removed = 0
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now and (limit is None or removed < limit):
+            _, seq, key = heapq.heappop(deadlines)
+            entry = self._cache.get(key)
+            if entry is not None and entry.seq == seq:
+                del self._cache[key]
+                self._unlink(key, entry)
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def _remove(self, key: str) -> bool:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return False
+        self._unlink(key, entry)
+        return True
+
+    def _unlink(self, key: str, entry: _Entry) -> None:
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _compact(self) -> None:
+        self._deadlines = [(e.expires_at, e.seq, k) for k, e in self._cache.items()]
+        heapq.heapify(self._deadlines)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache backend shared by all workers through a Redis-protocol server.
+
+    Values are pickled into Redis with a TTL and tags are kept as Redis sets. Reads go
+    through a short-lived in-process near cache first; every delete and tag invalidation
+    is published on a pub/sub channel so the other workers drop their near-cache copies.
+    A worker may therefore serve a stale value for at most ``near_ttl`` seconds.
+
+    Tag sets use ``EXPIRE ... GT/NX`` and need Redis 7.0 or newer.
+    """
+
+    def __init__(
+            self,
+            client: Any,
+            channel: str = "cache-invalidation",
+            near_cache: Optional[TTLCache] = None,
+            near_ttl: int = 5,
+            prefix: str = "cache:",
+    ):
+        """
+        Args:
+            client (Any): A ``redis.asyncio.Redis`` compatible client (fakeredis works too).
+            channel (str): Pub/sub channel used to broadcast invalidations.
+            near_cache (Optional[TTLCache]): Local cache in front of Redis; None disables it.
+            near_ttl (int): Seconds a value may be served from the near cache.
+            prefix (str): Prefix applied to every Redis key.
+        """
+        self.client = client
+        self.channel = channel
+        self.near = near_cache
+        self.near_ttl = near_ttl
+        self.prefix = prefix
+        self._listener: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self) -> None:
+        if self.near is not None and self._listener is None:
+            ready = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen(ready))
+            await ready.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.client.aclose()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Retrieves a value from the near cache, falling back to Redis.
+
+        Args:
+            key (str): The key to retrieve.
+
+        Returns:
+            Optional[Any]: The cached value if it exists and is not expired; otherwise, None.
+        """
+        if self.near is not None:
+            value = await self.near.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self._key(key))
+        pipe.get(self._meta(key))
+        raw, raw_tags = await pipe.execute()
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        value = pickle.loads(raw)
+        if self.near is not None:
+            tags = raw_tags.decode().split("\n") if raw_tags else ()
+            await self.near.set(key, value, self.near_ttl, tags=tags)
+        return value
+
+    async def set(self, key: str, value: Any, expiry_seconds: int, tags: Iterable[str] = ()) -> None:
+        """
+        Stores a value in Redis with an expiry time and registers it under its tags.
+
+        Args:
+            key (str): The key to store in the cache.
+            value (Any): The value to store.
+            expiry_seconds (int): The number of seconds after which the cache entry expires.
+            tags (Iterable[str]): Tags the entry can later be invalidated by.
+        """
+        tags = tuple(tags)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=expiry_seconds)
+        if tags:
+            pipe.set(self._meta(key), "\n".join(tags), ex=expiry_seconds)
+        for tag in tags:
+            pipe.sadd(self._tag(tag), key)
+            pipe.expire(self._tag(tag), expiry_seconds, gt=True)
+            pipe.expire(self._tag(tag), expiry_seconds, nx=True)
+        await pipe.execute()
+
+        if self.near is not None:
+            await self.near.set(key, value, min(self.near_ttl, expiry_seconds), tags=tags)
+
+    async def delete(self, key: str) -> bool:
+        """
+        Deletes a key everywhere and tells the other workers to drop it.
+
+        Args:
+            key (str): The key to delete.
+
+        Returns:
+            bool: True if the key was deleted, False if the key was not found.
+        """
+        deleted = await self.client.delete(self._key(key), self._meta(key))
+        await self._broadcast(f"key:{key}")
+        if self.near is not None:
+            await self.near.delete(key)
+        return deleted > 0
+
+    async def invalidate_tag(self, tag: str) -> int:
+        """
+        Deletes all entries stored under a tag and tells the other workers to drop them.
+
+        Args:
+            tag (str): The tag to invalidate, e.g. ``user:42``.
+
+        Returns:
+            int: The number of keys deleted.
+        """
+        tag_key = self._tag(tag)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.smembers(tag_key)
+        pipe.delete(tag_key)
+        members, _ = await pipe.execute()
+
+        deleted = 0
+        if members:
+            keys = [member.decode() for member in members]
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(*[self._key(k) for k in keys])
+            pipe.delete(*[self._meta(k) for k in keys])
+            deleted, _ = await pipe.execute()
+
+        await self._broadcast(f"tag:{tag}")
+        if self.near is not None:
+            await self.near.invalidate_tag(tag)
+        return deleted
+
+    async def clear(self) -> None:
+        """
+        Removes every key under this cache's prefix and empties all near caches.
+        """
+        batch = []
+        async for redis_key in self.client.scan_iter(match=f"{self.prefix}*", count=1000):
+            batch.append(redis_key)
+            if len(batch) >= 1000:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+        await self._broadcast("clear")
+        if self.near is not None:
+            await self.near.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters together with the near cache statistics.
+        """
+        stats = {"hits": self.hits, "misses": self.misses}
+        if self.near is not None:
+            stats.update({f"near_{k}": v for k, v in self.near.stats().items()})
+        return stats
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}v:{key}"
+
+    def _meta(self, key: str) -> str:
+        return f"{self.prefix}m:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}t:{tag}"
+
+    async def _broadcast(self, message: str) -> None:
+        if self.near is not None:
+            await self.client.publish(self.channel, message)
+
+    async def _apply(self, message: str) -> None:
+        kind, _, name = message.partition(":")
+        if kind == "key":
+            await self.near.delete(name)
+        elif kind == "tag":
+            await self.near.invalidate_tag(name)
+        elif kind == "clear":
+            await self.near.clear()
+
+    async def _listen(self, ready: asyncio.Event) -> None:
+        """
+        Applies invalidations published by other workers to the near cache.
+        Reconnects on errors and empties the near cache, since messages may have been missed.
+        """
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                ready.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    await self._apply(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener failed; reconnecting")
+                await self.near.clear()
+                await asyncio.sleep(1)
+            finally:
+                ready.set()
+                await pubsub.aclose()
+
+
+def create_cache() -> CacheBackend:
+    """
+    Builds the cache backend selected by ``settings.CACHE_BACKEND``.
+
+    Returns:
+        CacheBackend: An in-process TTLCache for "memory", a RedisCache for "redis".
+    """
+    if settings.CACHE_BACKEND == "memory":
+        return TTLCache(max_entries=settings.CACHE_MAX_ENTRIES, max_bytes=settings.CACHE_MAX_BYTES)
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+
+        near_cache = None
+        if settings.CACHE_NEAR_TTL > 0:
+            near_cache = TTLCache(max_entries=settings.CACHE_NEAR_MAX_ENTRIES, max_bytes=settings.CACHE_MAX_BYTES)
+        return RedisCache(
+            Redis.from_url(settings.REDIS_URL),
+            channel=settings.CACHE_INVALIDATION_CHANNEL,
+            near_cache=near_cache,
+            near_ttl=settings.CACHE_NEAR_TTL,
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
 
 
-cache = SimpleCache()
+cache = create_cache()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, NamedTuple, Set, Tuple
+
+from app.cache import CacheBackend, cache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one in-flight call whose result is shared by all callers.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Returns True if a call for the key is currently running.
+        """
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `fn` unless a call for the same key is already running, in which case its result is awaited instead.
+
+        Args:
+            key (Hashable): Identifies the call.
+            fn (Callable[[], Awaitable[Any]]): Coroutine function producing the result.
+
+        Returns:
+            Any: The result of the shared call.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # Shielded so one caller being cancelled does not cancel the load for everyone else
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Detaches the running call for the key, so the next caller starts a new one.
+        """
+        self._calls.pop(key, None)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+
+class Stamped(NamedTuple):
+    """
+    Cached value together with the time it stops being fresh and how long it took to load.
+    """
+    value: Any
+    fresh_until: float
+    delta: float
+
+
+class _PendingLoad:
+    __slots__ = ("key", "valid")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.valid = True
+
+
+class CacheAside:
+    """
+    Cache-aside reads with single-flight loading, stale-while-revalidate and probabilistic early refresh.
+
+    On a miss only one load per key runs and every concurrent caller awaits it. An entry stays in the
+    backend for `stale_ttl` seconds after it stops being fresh: the first caller to see it stale reloads
+    it while everyone else keeps getting the stale value. Before the TTL runs out, callers may refresh the
+    entry early with a probability that grows as expiry approaches (XFetch), scaled by `beta` and by how
+    long the last load took; a `beta` of 0 disables early refresh.
+    """
+
+    def __init__(self, backend: CacheBackend, stale_ttl: int = 0, beta: float = 1.0):
+        """
+        Args:
+            backend (CacheBackend): Where the values are stored.
+            stale_ttl (int): Seconds an expired value may still be served while it is reloaded.
+            beta (float): Early refresh aggressiveness; 0 disables early refresh.
+        """
+        self.backend = backend
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self.flight = SingleFlight()
+        self._pending: Dict[str, Set[_PendingLoad]] = {}
+
+    async def get_or_load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            expiry_seconds: int,
+            tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Returns the cached value for the key, loading and caching it if needed.
+
+        Args:
+            key (str): The cache key.
+            loader (Callable[[], Awaitable[Any]]): Coroutine function loading the value on a miss.
+            expiry_seconds (int): The number of seconds the loaded value stays fresh.
+            tags (Iterable[str]): Tags the entry can later be invalidated by.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        tags = tuple(tags)
+        entry = await self.backend.get(key)
+        if entry is None:
+            return await self.flight.do(key, lambda: self._load(key, loader, expiry_seconds, tags))
+
+        now = time.time()
+        if now < entry.fresh_until and not self._refresh_early(entry, now):
+            return entry.value
+        if self.flight.in_flight(key):
+            return entry.value
+
+        try:
+            return await self.flight.do(key, lambda: self._load(key, loader, expiry_seconds, tags))
+        except Exception:
+            logger.exception("Refreshing cache key %s failed; serving the cached value", key)
+            return entry.value
+
+    async def invalidate_tag(self, tag: str) -> int:
+        """
+        Invalidates a tag in the backend and makes sure loads already in flight for it are not cached.
+
+        Args:
+            tag (str): The tag to invalidate, e.g. ``user:42``.
+
+        Returns:
+            int: The number of keys deleted.
+        """
+        for pending in self._pending.pop(tag, ()):
+            pending.valid = False
+            self.flight.forget(pending.key)
+        return await self.backend.invalidate_tag(tag)
+
+    def _refresh_early(self, entry: Stamped, now: float) -> bool:
+        if self.beta <= 0 or entry.delta <= 0:
+            return False
+        return now - entry.delta * self.beta * math.log(1.0 - random.random()) >= entry.fresh_until
+
+    async def _load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            expiry_seconds: int,
+            tags: Tuple[str, ...],
+    ) -> Any:
+        pending = _PendingLoad(key)
+        for tag in tags:
+            self._pending.setdefault(tag, set()).add(pending)
+        try:
+            start = time.time()
+            value = await loader()
+            end = time.time()
+            if pending.valid:
+                stamped = Stamped(value, end + expiry_seconds, end - start)
+                await self.backend.set(key, stamped, expiry_seconds + self.stale_ttl, tags=tags)
+            return value
+        finally:
+            for tag in tags:
+                waiting = self._pending.get(tag)
+                if waiting is not None:
+                    waiting.discard(pending)
+                    if not waiting:
+                        del self._pending[tag]
+
+
+cache_aside = CacheAside(cache, stale_ttl=settings.CACHE_STALE_TTL, beta=settings.CACHE_EARLY_REFRESH_BETA)
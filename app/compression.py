@@ -0,0 +1,50 @@
+import gzip
+from typing import NamedTuple, Optional
+
+from app.config import settings
+
+
+class EncodedBody(NamedTuple):
+    """
+    Encoded response body together with its gzip variant, if it is large enough to be worth compressing.
+    """
+    raw: bytes
+    gzipped: Optional[bytes]
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header value allows a gzip response.
+    Args:
+        accept_encoding (str): Header value, e.g. ``gzip, deflate, br`` or ``gzip;q=0``
+    Returns:
+        bool: True if gzip (or ``*``) is listed with a non-zero quality
+    """
+    wildcard = False
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if coding not in ("gzip", "*"):
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding == "gzip":
+            return quality > 0
+        wildcard = quality > 0
+    return wildcard
+
+
+def encode_body(raw: bytes) -> EncodedBody:
+    """
+    Pair an encoded body with its gzip variant, compressed at COMPRESSION_CACHED_LEVEL.
+    Bodies below COMPRESSION_MIN_SIZE, or all of them if compression is disabled, get no variant.
+    The gzip header carries no timestamp, so equal bodies compress to equal bytes.
+    """
+    if not settings.COMPRESSION_ENABLED or len(raw) < settings.COMPRESSION_MIN_SIZE:
+        return EncodedBody(raw, None)
+    return EncodedBody(raw, gzip.compress(raw, compresslevel=settings.COMPRESSION_CACHED_LEVEL, mtime=0))
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,14 +8,122 @@ class Settings(BaseSettings):
     MYSQL_ROOT_PASSWORD: str = "password"
     DB_HOST: str = "localhost"
     DB_NAME: str = "social_media_db"
+    DB_URL: str = ""  # Overrides the MySQL URL when set, e.g. sqlite+aiosqlite:///./bench.db
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 3600  # seconds
+    DB_POOL_WARMUP: int = 5  # connections opened at startup
+    DB_CREATE_SCHEMA: bool = True  # create missing tables, columns and indexes once at startup
+    LOCK_DIR: str = "/tmp/fastapi_mvc"  # lock files letting one worker per host run schema upgrades and the purger
 
     API_PREFIX: str = "/api/v1"
     SECRET_KEY: str = "your-secret-key-for-jwt"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_SIZE: int = 10000  # verified tokens kept in memory, 0 disables the cache
+    # Put is_active in access tokens and trust it instead of checking the user on post requests.
+    # A deactivated user's existing tokens then keep working until they expire.
+    JWT_ACTIVE_CLAIM: bool = False
+    USER_LIVENESS_TTL: int = 300  # seconds a live user is remembered, and served after being deactivated
+    USER_LIVENESS_NEGATIVE_TTL: int = 30  # seconds a missing or inactive user is remembered
+
+    PASSWORD_HASHER_EXECUTOR: str = "thread"  # "thread", "process" or "inline" (on the event loop)
+    PASSWORD_HASHER_WORKERS: int = 2
+    PASSWORD_HASHER_QUEUE: int = 32  # waiting hashes beyond this are rejected with 503
     CACHE_EXPIRY: int = 300  # 5 minutes in seconds
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 67108864  # 64 MB
+    CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared by all workers)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_NEAR_TTL: int = 5  # seconds a redis value may be served from the in-process near cache, 0 disables it
+    CACHE_NEAR_MAX_ENTRIES: int = 1000
+    CACHE_INVALIDATION_CHANNEL: str = "cache-invalidation"
+    CACHE_STALE_TTL: int = 30  # seconds an expired entry may be served while one request reloads it
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # probabilistic early refresh strength, 0 disables it
+    # Answer GET /posts with an ETag from a per-user version and 304 when If-None-Match still matches it
+    POSTS_ETAGS: bool = True
+    POSTS_VERSION_TTL: int = 300  # seconds a version is kept; bounds staleness with the per-worker memory backend
+    CACHE_RESPONSE_BYTES: bool = True  # cache GET /posts as encoded JSON and serve it without re-validation
+    # Serialize responses with prebuilt pydantic TypeAdapters, skipping response_model re-validation. Off by default:
+    # benchmarks/json_throughput.py showed no reliable gain outside GET /posts, which CACHE_RESPONSE_BYTES already serves
+    FAST_JSON: bool = False
+
+    # Gzip responses of at least COMPRESSION_MIN_SIZE bytes for clients that accept it. Cached post pages
+    # keep a variant compressed once at COMPRESSION_CACHED_LEVEL; everything else is compressed per response
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 5
+    COMPRESSION_CACHED_LEVEL: int = 9
 
     MAX_PAYLOAD_SIZE: int = 1048576  # 1 MB in bytes
+    # Body size limits overriding MAX_PAYLOAD_SIZE, keyed by "METHOD /path/template" without API_PREFIX
+    MAX_PAYLOAD_SIZE_ROUTES: Dict[str, int] = {
+        "POST /auth/signup": 4096,
+        "POST /auth/login": 4096,
+    }
+
+    # Admission control, keyed by "METHOD /path/template" without API_PREFIX: at most LIMIT requests run at once
+    # per route, up to QUEUE more wait at most ADMISSION_QUEUE_TIMEOUT seconds, everything else gets 503 right away
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {
+        "POST /auth/signup": 8,
+        "POST /auth/login": 8,
+        "POST /posts": 64,
+        "POST /posts/batch": 16,
+        "GET /posts": 64,
+        "GET /posts/export": 4,
+        "DELETE /posts": 16,
+        "DELETE /posts/{post_id}": 64,
+    }
+    ADMISSION_ROUTE_QUEUES: Dict[str, int] = {}  # per-route queue sizes, ADMISSION_QUEUE_SIZE otherwise
+    ADMISSION_QUEUE_SIZE: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1  # Retry-After seconds sent with 503 responses
+    # Per-client token bucket on the bcrypt-bound routes; 0 disables it. Clients are told apart by their address,
+    # so behind a reverse proxy it needs RATE_LIMIT_TRUSTED_PROXIES, or every user shares the proxy's bucket
+    AUTH_RATE_LIMIT_PER_MINUTE: float = 60.0
+    AUTH_RATE_LIMIT_BURST: int = 20
+    RATE_LIMITED_ROUTES: List[str] = ["POST /auth/signup", "POST /auth/login"]
+    # Number of reverse proxies in front of the app that append to X-Forwarded-For. The client is the entry that
+    # many places from the right; entries further left are set by the client and ignored. 0 uses the peer address
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0
+
+    METRICS_ENABLED: bool = True  # expose /metrics and record request, pool, cache and auth timings
+    METRICS_PATH: str = "/metrics"
+    # Aggregate metrics across gunicorn workers with prometheus_client's multiprocess mode;
+    # requires the PROMETHEUS_MULTIPROC_DIR environment variable (see gunicorn.conf.py)
+    METRICS_MULTIPROCESS: bool = False
+    METRICS_REFRESH_INTERVAL: float = 5.0  # seconds between pool/cache gauge updates in multiprocess mode
+
+    # Per-request SQL tracking: Server-Timing header, slow-query log and repeated-statement (N+1) warnings
+    SQL_TRACKING: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_REPEAT_THRESHOLD: int = 10  # warn when one request runs the same statement more often than this
+
+    # Opt-in sampling profiler: requests carrying a valid signed X-Profile header (see `python -m app.profiler`),
+    # a random share of requests, or requests still running after PROFILER_SLOW_MS are profiled
+    PROFILER_ENABLED: bool = False
+    PROFILER_SECRET: str = ""  # signs X-Profile headers and guards the profile download endpoints
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_SLOW_MS: float = 0.0  # 0 disables latency-triggered profiling
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_DIR: str = "profiles"
+    PROFILER_MAX_FILES: int = 100
+
+    POSTS_PAGE_SIZE: int = 50
+    POSTS_MAX_PAGE_SIZE: int = 200
+    POSTS_BATCH_MAX: int = 100  # posts accepted by one POST /posts/batch request
+    POSTS_EXPORT_CHUNK: int = 1000  # rows fetched per round trip by GET /posts/export
+    POST_WRITE_BATCHING: bool = False  # group concurrent POST /posts inserts into shared transactions
+    POST_WRITE_BATCH_DELAY_MS: float = 2.0  # how long the first queued insert waits for company
+    POST_WRITE_BATCH_MAX: int = 100  # inserts flushed in one transaction at most
+
+    POST_PURGE_ENABLED: bool = True  # hard-delete soft-deleted posts in the background, in one worker per host
+    POST_PURGE_INTERVAL: int = 60  # seconds between purge runs
+    POST_PURGE_GRACE: int = 3600  # seconds a soft-deleted post is kept before it is purged
+    POST_PURGE_CHUNK: int = 500  # rows removed per transaction
+    POST_PURGE_PAUSE_MS: int = 50  # pause between chunks so purging never hogs the database
 
     class Config:
         env_file = ".env"
@@ -23,6 +133,8 @@ class Settings(BaseSettings):
         """
         Constructs the full database connection string from individual components.
         """
+        if self.DB_URL:
+            return self.DB_URL
         return f"mysql+aiomysql://{self.DB_USER}:{self.MYSQL_ROOT_PASSWORD}@{self.DB_HOST}/{self.DB_NAME}"
 
 
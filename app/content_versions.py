@@ -0,0 +1,74 @@
+import time
+
+from app.cache import CacheBackend, cache
+from app.config import settings
+
+
+class ContentVersions:
+    """
+    Per-user content versions, so GET /posts can be answered with 304 without loading any posts.
+
+    A user's version changes whenever their posts do. Versions are taken from the clock in
+    nanoseconds and never go below the previous version plus one, so they only grow, and a version
+    lost to expiry, eviction or a restart comes back as a new one instead of repeating an old one.
+    Entries expire after `ttl` seconds, which bounds how long a worker that missed an update
+    (each worker has its own with the memory backend) can keep answering 304.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 300):
+        """
+        Args:
+            backend (CacheBackend): Where the versions are stored.
+            ttl (int): Seconds a version is kept after it was last set.
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self._last = 0
+
+    async def get(self, user_id: int) -> int:
+        """
+        Returns the user's current content version, starting a new one if none is stored.
+
+        The new version is stored before the caller loads anything, so content loaded afterwards
+        is never older than the version it is served with.
+
+        Args:
+            user_id (int): The user ID.
+
+        Returns:
+            int: The content version.
+        """
+        version = await self.backend.get(self._key(user_id))
+        if version is None:
+            version = self._next(0)
+            await self.backend.set(self._key(user_id), version, self.ttl)
+        return version
+
+    async def bump(self, user_id: int) -> int:
+        """
+        Moves the user's content version forward; call it after the change is committed.
+
+        The old entry is deleted rather than overwritten so that workers holding it in a near cache drop it too.
+
+        Args:
+            user_id (int): The user ID.
+
+        Returns:
+            int: The new content version.
+        """
+        key = self._key(user_id)
+        version = self._next(await self.backend.get(key) or 0)
+        await self.backend.delete(key)
+        await self.backend.set(key, version, self.ttl)
+        return version
+
+    def _next(self, previous: int) -> int:
+        self._last = max(time.time_ns(), previous + 1, self._last + 1)
+        return self._last
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"posts_version_{user_id}"
+
+
+content_versions = ContentVersions(cache, ttl=settings.POSTS_VERSION_TTL)
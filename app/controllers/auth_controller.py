@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 
+from app.responses import model_response
 from app.services.auth_service import AuthService
 from app.schemas.auth import UserCreate, UserLogin, TokenResponse
 from dependencies import get_auth_service
@@ -25,7 +26,7 @@ async def signup(
     """
     try:
         token = await auth_service.register_user(user_data.email, user_data.password)
-        return token
+        return model_response(token, status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -54,4 +55,4 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
-    return token
+    return model_response(token)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from app import metrics
+from app.config import settings
+
+router = APIRouter()
+
+
+@router.get(settings.METRICS_PATH, include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Expose the application metrics in the Prometheus text format.
+    Returns:
+        Response: Metrics of this worker, or of all gunicorn workers in multiprocess mode
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
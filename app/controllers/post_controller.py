@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+
+from app.compression import accepts_gzip
+from app.config import settings
+from app.pagination import decode_cursor
+from app.responses import etag_matches, model_response
 
 from app.services.post_service import PostService
-from app.schemas.post import PostCreate, PostResponse, PostIDResponse, PostsResponse
-from dependencies import get_post_service, get_current_user_id, validate_payload_size
+from app.schemas.post import (
+    PostBatchCreate, PostBatchDelete, PostCreate, PostResponse, PostIDResponse, PostIDsResponse, PostsDeletedResponse,
+    PostsResponse
+)
+from dependencies import get_post_service, get_current_user_id
 
 router = APIRouter(prefix="/posts")
 
 
-@router.post("", response_model=PostIDResponse, status_code=status.HTTP_201_CREATED,
-             dependencies=[Depends(validate_payload_size)])
+@router.post("", response_model=PostIDResponse, status_code=status.HTTP_201_CREATED)
 async def add_post(
         post_data: PostCreate,
         user_id: int = Depends(get_current_user_id),
@@ -24,7 +32,30 @@ async def add_post(
     """
     try:
         post_id = await post_service.create_post(post_data.text, user_id)
-        return post_id
+        return model_response(post_id, status.HTTP_201_CREATED)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
+@router.post("/batch", response_model=PostIDsResponse, status_code=status.HTTP_201_CREATED)
+async def add_posts(
+        batch: PostBatchCreate,
+        user_id: int = Depends(get_current_user_id),
+        post_service: PostService = Depends(get_post_service)
+):
+    """
+    Create several posts in one request.
+    Returns:
+        PostIDsResponse: Created post IDs, in request order
+    Raises:
+        HTTPException: If user not found
+    """
+    try:
+        post_ids = await post_service.create_posts([post.text for post in batch.posts], user_id)
+        return model_response(post_ids, status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,24 +65,103 @@ async def add_post(
 
 @router.get("", response_model=PostsResponse)
 async def get_posts(
+        request: Request,
+        response: Response,
+        limit: int = Query(settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        user_id: int = Depends(get_current_user_id),
+        post_service: PostService = Depends(get_post_service)
+):
+    """
+    Get a page of posts by the authenticated user, newest first.
+    Responses carry an ETag derived from the user's content version and the page's limit and cursor;
+    a request whose If-None-Match still matches it gets 304 without any post being loaded.
+    Args:
+        limit (int): Page size
+        cursor (Optional[str]): Opaque cursor returned as next_cursor by the previous page
+    Returns:
+        PostsResponse: Page of user's posts and the cursor of the next page, or 304 Not Modified
+    Raises:
+        HTTPException: If the cursor is invalid or user not found
+    """
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    try:
+        validators = {}
+        if settings.POSTS_ETAGS:
+            etag = await post_service.get_posts_etag(user_id, limit, before)
+            validators = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), validators["ETag"]):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+        if settings.CACHE_RESPONSE_BYTES:
+            body = await post_service.get_user_posts_json(user_id, limit, before)
+            if body.gzipped is not None and accepts_gzip(request.headers.get("accept-encoding", "")):
+                return Response(content=body.gzipped, media_type="application/json",
+                                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding", **validators})
+            return Response(content=body.raw, media_type="application/json", headers=validators)
+        posts = await post_service.get_user_posts(user_id, limit, before)
+        result = model_response(posts)
+        # With FAST_JSON off the model is returned and FastAPI copies these headers onto its response
+        (result if isinstance(result, Response) else response).headers.update(validators)
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
+@router.get("/export", response_class=StreamingResponse,
+            responses={200: {"content": {"application/x-ndjson": {}}, "description": "One post per line"}})
+async def export_posts(
         user_id: int = Depends(get_current_user_id),
         post_service: PostService = Depends(get_post_service)
 ):
     """
-    Get all posts by the authenticated user.
+    Stream every post of the authenticated user as NDJSON, newest first.
+    Memory use stays flat regardless of how many posts the user has.
     Returns:
-        PostsResponse: List of user's posts
+        StreamingResponse: One PostResponse JSON document per line
     Raises:
         HTTPException: If user not found
     """
     try:
-        posts = await post_service.get_user_posts(user_id)
-        return PostsResponse(posts=posts)
+        chunks = await post_service.export_user_posts(user_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+
+@router.delete("", response_model=PostsDeletedResponse)
+async def delete_posts(
+        batch: PostBatchDelete,
+        user_id: int = Depends(get_current_user_id),
+        post_service: PostService = Depends(get_post_service)
+):
+    """
+    Delete several posts of the authenticated user at once.
+    IDs that do not exist or belong to another user are skipped.
+    Args:
+        batch (PostBatchDelete): IDs of the posts to delete
+        user_id (int): Current user ID from token
+        post_service (PostService): Post service
+    Returns:
+        PostsDeletedResponse: Number of posts deleted
+    """
+    deleted = await post_service.delete_posts(batch.post_ids, user_id)
+    return model_response(deleted)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
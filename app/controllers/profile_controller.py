@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.profiler import profiler
+from app.schemas.profile import ProfilesResponse
+from dependencies import require_profiler_access
+
+router = APIRouter(prefix="/admin/profiles", dependencies=[Depends(require_profiler_access)])
+
+
+@router.get("", response_model=ProfilesResponse)
+async def list_profiles():
+    """
+    List the stored request profiles.
+    Returns:
+        ProfilesResponse: Profile names, newest first
+    """
+    return ProfilesResponse(profiles=profiler.list_profiles())
+
+
+@router.get("/{name}")
+async def download_profile(name: str):
+    """
+    Download one profile in the collapsed-stack format (one ``frame;frame;frame count`` line per stack),
+    ready for flamegraph.pl or speedscope.
+    Args:
+        name (str): Profile name as returned by the list endpoint or the X-Profile-Id header
+    Returns:
+        FileResponse: The profile
+    Raises:
+        HTTPException: If there is no such profile
+    """
+    path = profiler.path_of(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
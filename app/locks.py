@@ -0,0 +1,59 @@
+import fcntl
+import os
+from typing import Optional
+
+from app.config import settings
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, shared by every worker process on the host.
+
+    The operating system releases it when the holding process exits, so a worker that
+    dies never leaves it held. It does not coordinate processes on different hosts.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): File name of the lock inside LOCK_DIR.
+        """
+        self.path = os.path.join(settings.LOCK_DIR, name)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock.
+        Args:
+            blocking (bool): Wait for another process to release it instead of giving up
+        Returns:
+            bool: True if the lock is now held by this process
+        """
+        if self._fd is not None:
+            return True
+        os.makedirs(settings.LOCK_DIR, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -1,19 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, UTC
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.controllers import auth_controller, post_controller
+from app.controllers import auth_controller, metrics_controller, post_controller, profile_controller
+from app.admission import concurrency_limiters, rate_limiters
+from app.cache import cache
 from app.config import settings
-from app.models import Base, engine
+from app.metrics import refresh_runtime_metrics_forever
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.sql_tracking import SQLTrackingMiddleware
+from app.models import engine, init_db, warm_pool
+from app.profiler import profiler
+from app.repositories.post_write_batcher import post_write_batcher
+from app.responses import FastJSONResponse, adapter_for
+from app.schemas.auth import TokenResponse, UserLogin
+from app.schemas.post import PostCreate, PostIDResponse, PostIDsResponse, PostsDeletedResponse, PostsResponse
+from app.services.post_purger import post_purger
+from app.security import PasswordHasherBusy, password_hasher, warm_up
+from app.sql_tracking import sql_tracker
+
+
+def prime_schemas() -> None:
+    """
+    Run every request/response schema through validation and serialization once,
+    so the first real request does not pay for lazily built pydantic internals.
+    """
+    for model_type in (PostIDResponse, PostIDsResponse, PostsDeletedResponse, PostsResponse, TokenResponse):
+        adapter_for(model_type)
+    now = datetime.now(UTC)
+    PostCreate(text="warmup")
+    PostIDResponse(post_id=0).model_dump_json()
+    PostsResponse(posts=[{"id": 0, "text": "warmup", "created_at": now, "updated_at": now}]).model_dump_json()
+    UserLogin(email="warmup@example.com", password="warmup")
+    TokenResponse(access_token="warmup").model_dump_json()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: creates the schema once, opens pooled connections ahead of time,
+    primes hot objects and starts the background workers (password hasher, cache backend,
+    post write batcher, purger and, in multiprocess metrics mode, the runtime metrics refresher)
+    before the first request; stops them and disposes of the pool on shutdown.
+    """
+    if settings.DB_CREATE_SCHEMA:
+        await init_db()
+    await warm_pool(min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+    prime_schemas()
+    warm_up()
+    password_hasher.start()
+    await cache.start()
+    if settings.POST_WRITE_BATCHING:
+        post_write_batcher.start()
+    if settings.POST_PURGE_ENABLED:
+        post_purger.start()
+    metrics_refresher = None
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROCESS:
+        metrics_refresher = asyncio.create_task(refresh_runtime_metrics_forever(settings.METRICS_REFRESH_INTERVAL))
+    yield
+    if metrics_refresher is not None:
+        metrics_refresher.cancel()
+    await post_purger.close()
+    await post_write_batcher.close()
+    await cache.close()
+    password_hasher.shutdown()
+    await engine.dispose()
 
 
 app = FastAPI(
     title="Social Media API",
     description="A FastAPI social media application with user authentication and post management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON else JSONResponse
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_LEVEL,
+    )
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_size=settings.MAX_PAYLOAD_SIZE,
+    route_limits=settings.MAX_PAYLOAD_SIZE_ROUTES,
+    prefix=settings.API_PREFIX,
+)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters=concurrency_limiters(),
+        rate_limiters=rate_limiters(),
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+        trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES,
+        prefix=settings.API_PREFIX,
+    )
+if settings.PROFILER_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiler,
+        secret=settings.PROFILER_SECRET,
+        sample_rate=settings.PROFILER_SAMPLE_RATE,
+        slow_seconds=settings.PROFILER_SLOW_MS / 1000,
+    )
+if settings.SQL_TRACKING:
+    sql_tracker.install(engine)
+    app.add_middleware(SQLTrackingMiddleware, repeat_threshold=settings.SQL_REPEAT_THRESHOLD)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+# Added last so it is outermost: responses produced by the middlewares above (413, 429, 503) need the
+# CORS headers too, or browsers report them as network errors
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -24,6 +130,10 @@ app.add_middleware(
 
 app.include_router(auth_controller.router, prefix=settings.API_PREFIX, tags=["Authentication"])
 app.include_router(post_controller.router, prefix=settings.API_PREFIX, tags=["Posts"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_controller.router, tags=["Metrics"])
+if settings.PROFILER_ENABLED:
+    app.include_router(profile_controller.router, prefix=settings.API_PREFIX, tags=["Profiler"])
 
 
 @app.exception_handler(SQLAlchemyError)
@@ -44,6 +154,25 @@ async def sqlalchemy_exception_handler(request, exc):
     )
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request, exc):
+    """
+    Rejects requests that could not get a password hashing slot.
+
+    Args:
+        request: The incoming request object.
+        exc: The PasswordHasherBusy exception that was raised.
+
+    Returns:
+        JSONResponse: A response with status code 503 and a Retry-After header.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import prometheus_client
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+JWT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _WorkerMetric(ABC):
+    """
+    Metric kept in plain Python numbers for this worker only.
+
+    Every update happens on the event loop thread and never awaits, so no lock is taken;
+    the values are only read when /metrics is scraped. Mirrors the prometheus_client
+    `labels(...)` API so call sites do not depend on the collection mode.
+    """
+    child_type = _CounterChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Unlabelled metrics are updated directly, e.g. `metric.observe(0.1)`
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return self.child_type()
+
+    @abstractmethod
+    def collect(self) -> Metric:
+        ...
+
+
+class WorkerCounter(_WorkerMetric):
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def collect(self) -> Metric:
+        family = CounterMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for values, child in list(self._children.items()):
+            family.add_metric(values, child.value)
+        return family
+
+
+class WorkerGauge(_WorkerMetric):
+    child_type = _GaugeChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def collect(self) -> Metric:
+        family = GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for values, child in list(self._children.items()):
+            family.add_metric(values, child.value)
+        return family
+
+
+class WorkerHistogram(_WorkerMetric):
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def collect(self) -> Metric:
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for values, child in list(self._children.items()):
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                buckets.append((prometheus_client.utils.floatToGoString(bound), cumulative))
+            family.add_metric(values, buckets, child.sum)
+        return family
+
+
+_worker_metrics: List[_WorkerMetric] = []
+_runtime_gauges: Dict[str, prometheus_client.Gauge] = {}
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()):
+    """
+    Create a counter; a prometheus_client one shared across workers in multiprocess mode.
+    """
+    if settings.METRICS_MULTIPROCESS:
+        return prometheus_client.Counter(name, documentation, labelnames, registry=None)
+    metric = WorkerCounter(name, documentation, labelnames)
+    _worker_metrics.append(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()):
+    """
+    Create a gauge; summed over live workers in multiprocess mode.
+    """
+    if settings.METRICS_MULTIPROCESS:
+        return prometheus_client.Gauge(name, documentation, labelnames, registry=None, multiprocess_mode="livesum")
+    metric = WorkerGauge(name, documentation, labelnames)
+    _worker_metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS):
+    """
+    Create a histogram; a prometheus_client one shared across workers in multiprocess mode.
+    """
+    if settings.METRICS_MULTIPROCESS:
+        return prometheus_client.Histogram(name, documentation, labelnames, registry=None, buckets=buckets)
+    metric = WorkerHistogram(name, documentation, labelnames, buckets)
+    _worker_metrics.append(metric)
+    return metric
+
+
+http_requests = counter("http_requests", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_progress = gauge("http_requests_in_progress", "HTTP requests being served", ("method", "route"))
+db_pool_checkout_wait = histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    buckets=POOL_WAIT_BUCKETS,
+)
+password_hash_duration = histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify latency including the wait for a hasher worker",
+    ("operation",),
+)
+jwt_duration = histogram("jwt_duration_seconds", "JWT encode/decode latency", ("operation",), buckets=JWT_BUCKETS)
+admission_in_flight = gauge("admission_in_flight", "Requests holding an admission slot", ("route",))
+admission_queued = gauge("admission_queued", "Requests waiting for an admission slot", ("route",))
+admission_rejected = counter("admission_rejected", "Requests shed by admission control", ("route", "reason"))
+admission_limits = gauge("admission_limit", "Configured admission limits", ("route", "limit"))
+
+
+# Cache statistics that only ever grow are exposed as counters, everything else as gauges
+_CACHE_COUNTERS = ("hits", "misses", "evictions", "expirations")
+
+
+def _runtime_samples() -> Iterator[Tuple[str, str, str, Dict[str, str], float]]:
+    """
+    Figures read from the pool, the caches and the password hasher at scrape time,
+    as (name, documentation, type, labels, value).
+    """
+    from app.cache import cache
+    from app.models import engine
+    from app.security import password_hasher, token_cache
+
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        yield "db_pool_size", "Configured size of the connection pool", "gauge", {}, pool.size()
+        yield "db_pool_checked_out", "Connections currently checked out", "gauge", {}, pool.checkedout()
+        yield "db_pool_overflow", "Connections open beyond the pool size", "gauge", {}, max(0, pool.overflow())
+
+    for name, backend in (("response", cache), ("token", token_cache)):
+        for key, value in backend.stats().items():
+            kind = "counter" if key.endswith(_CACHE_COUNTERS) else "gauge"
+            yield f"cache_{key}", f"Cache {key.replace('_', ' ')}", kind, {"cache": name}, value
+
+    stats = password_hasher.stats()
+    yield "password_hasher_in_flight", "Password hashes running or queued", "gauge", {}, stats["in_flight"]
+    yield "password_hasher_rejected", "Password hashes rejected because the queue was full", "counter", {}, \
+        stats["rejected"]
+
+
+def _runtime_families() -> Iterator[Metric]:
+    families: Dict[str, Metric] = {}
+    for name, documentation, kind, labels, value in _runtime_samples():
+        family = families.get(name)
+        if family is None:
+            family_type = CounterMetricFamily if kind == "counter" else GaugeMetricFamily
+            family = families[name] = family_type(name, documentation, labels=list(labels))
+        family.add_metric(list(labels.values()), value)
+    return iter(families.values())
+
+
+class _WorkerCollector(Collector):
+    def collect(self) -> Iterable[Metric]:
+        for metric in _worker_metrics:
+            yield metric.collect()
+        yield from _runtime_families()
+
+
+_registry: Optional[CollectorRegistry] = None
+
+
+def render() -> bytes:
+    """
+    Render every metric in the Prometheus text format.
+    In multiprocess mode the values written by all gunicorn workers are aggregated.
+    """
+    global _registry
+    if settings.METRICS_MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    if _registry is None:
+        _registry = CollectorRegistry(auto_describe=False)
+        _registry.register(_WorkerCollector())
+    return generate_latest(_registry)
+
+
+def refresh_runtime_metrics() -> None:
+    """
+    Copy the scrape-time figures of this worker into multiprocess gauges, so that
+    whichever worker serves /metrics reports the pool and cache figures of all of them.
+    """
+    for name, documentation, kind, labels, value in _runtime_samples():
+        metric_name = f"{name}_total" if kind == "counter" else name
+        gauge_ = _runtime_gauges.get(metric_name)
+        if gauge_ is None:
+            gauge_ = _runtime_gauges[metric_name] = prometheus_client.Gauge(
+                metric_name, documentation, list(labels), registry=None, multiprocess_mode="livesum"
+            )
+        (gauge_.labels(*labels.values()) if labels else gauge_).set(value)
+
+
+async def refresh_runtime_metrics_forever(interval: float) -> None:
+    """
+    Background task calling `refresh_runtime_metrics` every `interval` seconds in multiprocess mode.
+    """
+    while True:
+        try:
+            refresh_runtime_metrics()
+        except Exception:
+            logger.exception("Refreshing runtime metrics failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,91 @@
+import logging
+import math
+from typing import Dict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.admission import AdmissionRejected, ConcurrencyLimiter, TokenBucketLimiter
+from app.middleware.routing import route_key
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_FOR = b"x-forwarded-for"
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware shedding load before it reaches the connection pool or bcrypt.
+
+    Requests to rate-limited routes first take a token from their client's bucket (429 when empty),
+    then wait for a slot of their route's concurrency limiter (503 when the queue is full or the
+    wait times out). Both responses carry Retry-After. Routes without limits pass straight through.
+    Limiters are keyed by ``METHOD /path/template`` without `prefix`, e.g. ``POST /auth/login``.
+    Behind `trusted_proxies` reverse proxies, clients are identified by the X-Forwarded-For entry the
+    outermost proxy appended, counted from the right, since anything left of it is set by the client.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: Dict[str, ConcurrencyLimiter],
+                 rate_limiters: Dict[str, TokenBucketLimiter], retry_after: int = 1,
+                 trusted_proxies: int = 0, prefix: str = ""):
+        self.app = app
+        self.limiters = limiters
+        self.rate_limiters = rate_limiters
+        self.retry_after = retry_after
+        self.trusted_proxies = trusted_proxies
+        self.prefix = prefix
+        self._warned_forwarded = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_key(scope, self.prefix)
+        rate_limiter = self.rate_limiters.get(route)
+        if rate_limiter is not None:
+            wait = rate_limiter.take(self._client(scope))
+            if wait > 0:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests"},
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+                await response(scope, receive, send)
+                return
+
+        limiter = self.limiters.get(route)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except AdmissionRejected as exc:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded, try again later", "reason": exc.reason},
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    def _client(self, scope: Scope) -> str:
+        # Repeated headers form one list, in the order the proxies appended them
+        forwarded = [entry.strip()
+                     for key, value in scope["headers"] if key == FORWARDED_FOR
+                     for entry in value.decode("latin-1").split(",")]
+        if forwarded:
+            if self.trusted_proxies:
+                if len(forwarded) >= self.trusted_proxies:
+                    return forwarded[-self.trusted_proxies]
+            elif not self._warned_forwarded:
+                self._warned_forwarded = True
+                logger.warning("Rate-limited request carries X-Forwarded-For but RATE_LIMIT_TRUSTED_PROXIES "
+                               "is 0; all clients behind the proxy share one bucket")
+        client = scope.get("client")
+        return client[0] if client else ""
@@ -0,0 +1,80 @@
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.routing import route_key
+
+CONTENT_LENGTH = b"content-length"
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware enforcing a request body size limit on every route.
+
+    A declared Content-Length over the limit is answered with 413 before the app runs. Otherwise
+    the bytes are counted as `receive()` yields them, and the first chunk past the limit raises a
+    413 HTTPException inside the app, so chunked bodies are never buffered beyond the limit.
+    Limits can be overridden per ``METHOD /path/template`` without `prefix`, e.g. ``POST /auth/login``.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int, route_limits: Optional[Dict[str, int]] = None,
+                 prefix: str = ""):
+        self.app = app
+        self.max_size = max_size
+        self.route_limits = route_limits or {}
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_size
+        if self.route_limits:
+            limit = self.route_limits.get(route_key(scope, self.prefix), limit)
+
+        for key, value in scope["headers"]:
+            if key == CONTENT_LENGTH:
+                if value.isdigit() and int(value) > limit:
+                    await self._too_large(limit)(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Payload too large. Maximum size is {limit} bytes"
+                    )
+            return message
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, send_wrapper)
+        except HTTPException as exc:
+            # Raised outside FastAPI's exception handling, e.g. by a plain Starlette route
+            if exc.status_code != status.HTTP_413_REQUEST_ENTITY_TOO_LARGE or response_started:
+                raise
+            await self._too_large(limit)(scope, receive, send)
+
+    @staticmethod
+    def _too_large(limit: int) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": f"Payload too large. Maximum size is {limit} bytes"},
+        )
@@ -0,0 +1,25 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import Receive, Scope, Send
+
+from app.compression import accepts_gzip
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Gzip responses of at least `minimum_size` bytes for clients whose Accept-Encoding allows it.
+
+    Unlike Starlette's GZipMiddleware, ``gzip;q=0`` is honoured. Responses that already carry a
+    Content-Encoding, such as the precompressed post pages, are passed through untouched.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.profiler import Profile, SamplingProfiler, verify_profile_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware selecting requests for the sampling profiler.
+
+    A request is profiled from the start if it carries a valid signed ``X-Profile`` header or
+    is picked at `sample_rate`; the profile name is returned in an ``X-Profile-Id`` header.
+    With `slow_seconds` set, any other request still running after that long is profiled for
+    the rest of its run. Requests that are not selected are not sampled at all.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler, secret: str = "",
+                 sample_rate: float = 0.0, slow_seconds: float = 0.0):
+        self.app = app
+        self.profiler = profiler
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._selected(scope)
+        if reason is not None:
+            await self._profile(scope, receive, send, reason)
+        elif self.slow_seconds > 0:
+            await self._profile_if_slow(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    def _selected(self, scope: Scope) -> Optional[str]:
+        if self.secret:
+            for key, value in scope["headers"]:
+                if key == PROFILE_HEADER:
+                    if verify_profile_token(self.secret, value.decode("latin-1")):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, reason: str) -> None:
+        profile = self.profiler.begin(self.profiler.profile_name(scope["method"], scope["path"], reason))
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.name)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.end(profile)
+
+    async def _profile_if_slow(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        profile: Optional[Profile] = None
+
+        def start() -> None:
+            nonlocal profile
+            profile = self.profiler.begin(self.profiler.profile_name(scope["method"], scope["path"], "slow"), task)
+
+        timer = asyncio.get_running_loop().call_later(self.slow_seconds, start)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            timer.cancel()
+            if profile is not None:
+                path = self.profiler.end(profile)
+                if path is not None:
+                    logger.info("Profiled slow request %s %s: %s", scope["method"], scope["path"], path)
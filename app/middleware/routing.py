@@ -0,0 +1,38 @@
+from starlette.routing import Match
+from starlette.types import Scope
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the route a request will be dispatched to, e.g. ``/api/v1/posts/{post_id}``,
+    so that per-route metrics and limits do not grow with every distinct ID.
+    The result is kept in the scope, so the routes are matched once per request.
+    """
+    template = scope.get("route_template")
+    if template is not None:
+        return template
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    else:
+        template = partial or UNMATCHED_ROUTE
+    scope["route_template"] = template
+    return template
+
+
+def route_key(scope: Scope, prefix: str = "") -> str:
+    """
+    ``METHOD /path/template`` of a request with `prefix` (the API prefix) removed from the template,
+    e.g. ``POST /auth/login``, so per-route settings keep working when the prefix changes.
+    """
+    template = route_template(scope)
+    if prefix and template.startswith(prefix + "/"):
+        template = template[len(prefix):]
+    return f"{scope['method']} {template}"
@@ -0,0 +1,45 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.sql_tracking import RequestQueries, current_queries
+
+logger = logging.getLogger(__name__)
+
+
+class SQLTrackingMiddleware:
+    """
+    ASGI middleware collecting the SQL statements of each request.
+
+    Adds a ``Server-Timing: db;dur=...`` header with the query count and total database time,
+    and warns when one statement fingerprint ran more than `repeat_threshold` times (likely N+1).
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 10):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope["path"])
+        token = current_queries.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", queries.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+            for key, count in queries.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Repeated query count=%d method=%s path=%s fingerprint=%s",
+                    count, scope["method"], queries.path, key,
+                    extra={"sql_repeat_count": count, "path": queries.path, "sql_fingerprint": key},
+                )
@@ -1,9 +1,38 @@
+import asyncio
+import time
+
+from sqlalchemy import DateTime, inspect
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql.expression import FunctionElement
 from typing import Generator
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.metrics import db_pool_checkout_wait
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long every checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
 
-engine = create_async_engine(settings.DATABASE_URL)
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    **({"poolclass": InstrumentedPool} if settings.METRICS_ENABLED else {}),
+)
 SessionLocal = async_sessionmaker(engine, autocommit=False, autoflush=False)
 
 
@@ -11,13 +40,100 @@ class Base(DeclarativeBase):
     pass
 
 
+class utcnow(FunctionElement):
+    """
+    Server-side current timestamp that round-trips exactly through bound parameters,
+    so it can be compared for equality in keyset pagination queries.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP has no fractional part on SQLite while bound datetimes always carry
+    # microseconds, which breaks string equality; store the same format SQLAlchemy binds.
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def upgrade_schema(conn) -> None:
+    """
+    Add the columns and indexes that tables created by an older version are missing.
+    create_all only creates missing tables, so without this a database created before a column
+    was added (e.g. posts.deleted_at) would fail every query that uses it.
+    Args:
+        conn: Synchronous connection, as passed by `AsyncConnection.run_sync`
+    Raises:
+        RuntimeError: If a missing column cannot be added to a table that has rows (NOT NULL without a default)
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a default")
+            # Full column DDL, so NOT NULL and the server default match the model and fill existing rows
+            conn.exec_driver_sql(
+                f"ALTER TABLE {quote(table.name)} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}"
+            )
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
+
+
+async def init_db() -> None:
+    """
+    Create all tables that do not exist yet and upgrade the ones that do.
+    Called once at application startup instead of on every request; workers starting
+    together take turns, so only the first one changes the schema.
+    """
+    # Make sure every model is registered on Base.metadata before create_all
+    from app.models import post, user  # noqa: F401
+    from app.locks import FileLock
+
+    lock = FileLock("schema.lock")
+    # Wait for the lock in a thread so the event loop keeps running while another worker upgrades
+    await asyncio.to_thread(lock.acquire)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
+    finally:
+        lock.release()
+
+
+async def warm_pool(size: int) -> None:
+    """
+    Open `size` pooled connections ahead of time and return them to the pool,
+    so the first requests do not pay for the connection handshake.
+    Args:
+        size (int): Number of connections to open
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(await engine.connect())
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
 async def get_db() -> Generator:
     """
     Create and yield a database async_session.
     Ensures proper closure of the session after use.
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
     db = SessionLocal()
     try:
         yield db
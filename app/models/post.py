@@ -1,10 +1,11 @@
 from datetime import datetime
+from typing import Optional
 
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 
-from app.models import Base
+from app.models import Base, utcnow
 
 
 class Post(Base):
@@ -17,15 +18,21 @@ class Post(Base):
         user_id (int): Foreign key to users table
         created_at (datetime): Post creation timestamp
         updated_at (datetime): Last update timestamp
+        deleted_at (Optional[datetime]): Soft-delete timestamp, None for live posts
         author (relationship): Relationship to User model
     """
     __tablename__ = "posts"
+    __table_args__ = (
+        # Serves per-user listings newest first and the user_id foreign key
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     text: Mapped[str] = mapped_column(String(250), nullable=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=utcnow())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
     # Relationship with User model
     author = relationship("User", back_populates="posts")
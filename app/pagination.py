@@ -0,0 +1,34 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """
+    Encode a keyset position into an opaque cursor string.
+    Args:
+        created_at (datetime): Creation time of the last item on the page
+        post_id (int): ID of the last item on the page
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Args:
+        cursor (str): Opaque cursor string
+    Returns:
+        Tuple[datetime, int]: The (created_at, id) keyset position
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
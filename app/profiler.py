@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+
+import greenlet
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def sign_profile_token(secret: str, ttl: int = 300) -> str:
+    """
+    Create a value for the profiling trigger header, valid for `ttl` seconds.
+    Args:
+        secret (str): PROFILER_SECRET
+        ttl (int): Lifetime of the token in seconds
+    Returns:
+        str: Token of the form ``<expires>.<hex hmac-sha256>``
+    """
+    expires = str(int(time.time()) + ttl)
+    signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+    """
+    Check a token created by `sign_profile_token` against the secret and its expiry.
+    """
+    if not secret or "." not in token:
+        return False
+    expires, signature = token.split(".", 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class Profile:
+    """
+    Collapsed stacks sampled while one request's task was running on the event loop.
+    """
+    __slots__ = ("name", "stacks", "samples")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def collapsed(self) -> str:
+        """
+        The samples in the collapsed-stack format read by flamegraph.pl and speedscope.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _collapse(frame, loop_greenlet) -> Optional[str]:
+    names = []
+    while frame is not None:
+        # The event loop's callback runner and everything below it is the same for every sample
+        if frame.f_code.co_name == "_run" and frame.f_globals.get("__name__") == "asyncio.events":
+            break
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+        if frame is None and loop_greenlet is not None:
+            # The loop is running a greenlet (SQLAlchemy's async bridge); carry on with the
+            # coroutine stack that is suspended in the loop's own greenlet under it
+            frame, loop_greenlet = loop_greenlet.gr_frame, None
+    if not names:
+        return None
+    names.reverse()
+    return ";".join(names)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for individual requests.
+
+    A daemon thread wakes every `interval` seconds while at least one request is being profiled,
+    checks which asyncio task the event loop is running, and if it belongs to a profiled request
+    records the loop thread's current stack. Tasks a profiled task starts (single-flight cache loads,
+    the task group streaming a response body) belong to the same profile; a task factory installed
+    on the loop registers them as they are created. Time spent awaiting I/O is not on the loop and is not
+    sampled. When nothing is profiled the thread sleeps on an event and the task factory is uninstalled,
+    so unsampled requests cost nothing.
+
+    Only the stacks of the event loop thread are recorded, so work in executor threads
+    (bcrypt, the SQLite driver) shows up as the await that is waiting for it, or not at all.
+    """
+
+    def __init__(self, directory: str, interval: float = 0.005, max_files: int = 100):
+        """
+        Args:
+            directory (str): Where the collapsed-stack files are written.
+            interval (float): Seconds between samples.
+            max_files (int): Number of profiles kept; the oldest are deleted first.
+        """
+        self.directory = directory
+        self.interval = interval
+        self.max_files = max_files
+        self._active: Dict[asyncio.Task, Profile] = {}
+        self._wakeup = threading.Event()
+        # Held by the sampler while it records into a profile, and by `end` while detaching one
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._loop_greenlet: Optional[greenlet.greenlet] = None
+        self._switch_interval: Optional[float] = None
+        self._previous_factory = None
+
+    def begin(self, name: str, task: Optional[asyncio.Task] = None) -> Profile:
+        """
+        Start sampling `task` (the current task by default) under a profile called `name`.
+        """
+        task = task or asyncio.current_task()
+        profile = Profile(name)
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._loop_greenlet = greenlet.getcurrent()
+        if self._loop.get_task_factory() != self._task_factory:
+            self._previous_factory = self._loop.get_task_factory()
+            self._loop.set_task_factory(self._task_factory)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_forever, name="profiler", daemon=True)
+            self._thread.start()
+        if not self._active:
+            # The sampler only gets the GIL at the interpreter's switch interval (5ms by default),
+            # so shorten it while something is profiled to actually sample at `interval`
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._active[task] = profile
+        self._wakeup.set()
+        return profile
+
+    def end(self, profile: Profile) -> Optional[str]:
+        """
+        Stop sampling the current task and the tasks it started, and write its profile.
+        Returns:
+            Optional[str]: Path of the written file, or None if no sample was taken
+        """
+        with self._lock:
+            for task in [task for task, active in self._active.items() if active is profile]:
+                del self._active[task]
+        # The sampler no longer finds the profile, so its counter can be read safely
+        self._idle_if_done()
+        if not profile.samples:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, profile.name)
+        with open(path, "w") as f:
+            f.write(profile.collapsed())
+        self._rotate()
+        return path
+
+    def list_profiles(self) -> List[str]:
+        """
+        Names of the stored profiles, newest first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted((name for name in os.listdir(self.directory) if name.endswith(".collapsed")), reverse=True)
+
+    def path_of(self, name: str) -> Optional[str]:
+        """
+        Path of a stored profile, or None if there is no profile with that name.
+        """
+        if name != os.path.basename(name) or not name.endswith(".collapsed"):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    @staticmethod
+    def profile_name(method: str, path: str, reason: str) -> str:
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        slug = _UNSAFE.sub("_", path.strip("/")) or "root"
+        return f"{stamp}-{method}-{slug[:80]}-{reason}.collapsed"
+
+    def _rotate(self) -> None:
+        for name in self.list_profiles()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro, **kwargs) -> asyncio.Task:
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        if self._active:
+            parent = asyncio.current_task(loop)
+            profile = self._active.get(parent) if parent is not None else None
+            if profile is not None:
+                self._active[task] = profile
+                task.add_done_callback(self._forget)
+        return task
+
+    def _forget(self, task: asyncio.Task) -> None:
+        if self._active.pop(task, None) is not None:
+            self._idle_if_done()
+
+    def _idle_if_done(self) -> None:
+        if not self._active:
+            self._wakeup.clear()
+            if self._switch_interval is not None:
+                sys.setswitchinterval(self._switch_interval)
+                self._switch_interval = None
+            # Give task creation back to the previous factory; `begin` installs ours again
+            if self._loop is not None and self._loop.get_task_factory() == self._task_factory:
+                self._loop.set_task_factory(self._previous_factory)
+                self._previous_factory = None
+
+    def _sample_forever(self) -> None:
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            try:
+                self._sample()
+            except Exception:
+                logger.exception("Profiler sample failed")
+
+    def _sample(self) -> None:
+        with self._lock:
+            task = asyncio.current_task(self._loop)
+            profile = self._active.get(task) if task is not None else None
+            if profile is None:
+                return
+            stack = _collapse(sys._current_frames().get(self._loop_thread_id), self._loop_greenlet)
+            if stack is not None:
+                profile.stacks[stack] += 1
+                profile.samples += 1
+
+
+profiler = SamplingProfiler(
+    settings.PROFILER_DIR,
+    interval=settings.PROFILER_INTERVAL_MS / 1000,
+    max_files=settings.PROFILER_MAX_FILES,
+)
+
+
+if __name__ == "__main__":
+    # python -m app.profiler  ->  prints a trigger header value valid for five minutes
+    print(sign_profile_token(settings.PROFILER_SECRET))
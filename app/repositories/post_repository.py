@@ -1,8 +1,36 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from datetime import datetime, UTC
+from sqlalchemy import Dialect, Row, Select, and_, delete, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 from sqlalchemy.future import select
 from app.models.post import Post
-from sqlalchemy.future import select
+
+if TYPE_CHECKING:
+    from app.repositories.post_write_batcher import PostWriteBatcher
+
+# Columns needed to build a PostResponse
+POST_RESPONSE_COLUMNS = (Post.id, Post.text, Post.created_at, Post.updated_at)
+
+
+async def insert_posts(db: Union[AsyncSession, AsyncConnection], dialect: Dialect, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert posts with one multi-row INSERT inside the caller's transaction.
+    Args:
+        db (Union[AsyncSession, AsyncConnection]): Session or connection to execute on
+        dialect (Dialect): Dialect of the database behind `db`
+        rows (List[Dict[str, Any]]): Column values of each post
+    Returns:
+        List[int]: IDs of the inserted posts, in the order of `rows`
+    """
+    # A single multi-row INSERT assigns IDs in VALUES order, so ascending IDs match `rows`
+    stmt = insert(Post).values(rows)
+    if dialect.insert_returning:
+        result = await db.execute(stmt.returning(Post.id))
+        return sorted(result.scalars())
+    # MySQL has no RETURNING; InnoDB gives a simple multi-row INSERT consecutive IDs
+    # and reports the first one as lastrowid
+    result = await db.execute(stmt)
+    return list(range(result.lastrowid, result.lastrowid + len(rows)))
 
 
 class PostRepository:
@@ -10,13 +38,15 @@ class PostRepository:
     Repository for post-related database operations.
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, write_batcher: Optional["PostWriteBatcher"] = None):
         """
         Initialize repository with database session.
         Args:
             db (Session): SQLAlchemy database session
+            write_batcher (Optional[PostWriteBatcher]): Group-commit pipeline used by `create` when set
         """
         self.db = db
+        self.write_batcher = write_batcher
 
     async def get_by_id(self, post_id: int) -> Optional[Post]:
         """
@@ -26,56 +56,165 @@ class PostRepository:
         Returns:
             Optional[Post]: Post object or None if not found
         """
-        stmt = select(Post).where(Post.id==post_id)
+        stmt = select(Post).where(Post.id == post_id, Post.deleted_at.is_(None))
         post = await self.db.execute(stmt)
         return post.scalars().first()
 
-    async def get_by_user_id(self, user_id: int) -> List[Post]:
+    async def get_by_user_id(
+            self,
+            user_id: int,
+            limit: Optional[int] = None,
+            before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Post]:
         """
-        Get all posts by user ID.
+        Get posts by user ID, newest first, using (created_at, id) keyset pagination.
         Args:
             user_id (int): User ID
+            limit (Optional[int]): Maximum number of posts to return
+            before (Optional[Tuple[datetime, int]]): Only return posts older than this (created_at, id) position
         Returns:
             List[Post]: List of user's posts
         """
-        stmt = select(Post).where(Post.user_id == user_id)
+        stmt = self._user_posts_query(select(Post), user_id, limit, before)
         post = await self.db.execute(stmt)
         return post.scalars().all()
 
-    async def create(self, text: str, user_id: int) -> Post:
+    async def get_rows_by_user_id(
+            self,
+            user_id: int,
+            limit: Optional[int] = None,
+            before: Optional[Tuple[datetime, int]] = None
+    ) -> Sequence[Row]:
         """
-        Create a new post.
+        Same as `get_by_user_id`, but selects only the columns needed for a post response
+        and returns plain rows, skipping ORM entity hydration and the identity map.
+        Args:
+            user_id (int): User ID
+            limit (Optional[int]): Maximum number of posts to return
+            before (Optional[Tuple[datetime, int]]): Only return posts older than this (created_at, id) position
+        Returns:
+            Sequence[Row]: Rows with id, text, created_at and updated_at attributes
+        """
+        stmt = self._user_posts_query(select(*POST_RESPONSE_COLUMNS), user_id, limit, before)
+        rows = await self.db.execute(stmt)
+        return rows.all()
+
+    async def stream_rows_by_user_id(self, user_id: int, chunk_size: int) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream all of a user's posts, newest first, through a server-side cursor.
+        Only `chunk_size` rows are held in memory at a time, however many posts the user has.
+        Args:
+            user_id (int): User ID
+            chunk_size (int): Number of rows fetched from the cursor at a time
+        Yields:
+            Sequence[Row]: Chunks of rows with id, text, created_at and updated_at attributes
+        """
+        stmt = self._user_posts_query(select(*POST_RESPONSE_COLUMNS), user_id, None, None)
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    async def create(self, text: str, user_id: int) -> int:
+        """
+        Create a new post with a single INSERT; the ID comes back with the statement result.
+        With a write batcher the INSERT is grouped with concurrent ones into one transaction.
         Args:
             text (str): Post text
             user_id (int): User ID
         Returns:
-            Post: Created post object
+            int: ID of the created post
         """
-        db_post = Post(text=text, user_id=user_id)
+        if self.write_batcher is not None:
+            return await self.write_batcher.submit(text, user_id)
+
+        result = await self.db.execute(insert(Post).values(text=text, user_id=user_id))
+        await self.db.commit()
+        return result.inserted_primary_key[0]
 
-        self.db.add(db_post)
+    async def create_many(self, texts: List[str], user_id: int) -> List[int]:
+        """
+        Create several posts in one multi-row INSERT and one transaction.
+        Args:
+            texts (List[str]): Post texts
+            user_id (int): User ID
+        Returns:
+            List[int]: IDs of the created posts, in the order of `texts`
+        """
+        rows = [{"text": text, "user_id": user_id} for text in texts]
+        post_ids = await insert_posts(self.db, self.db.bind.dialect, rows)
         await self.db.commit()
-        await self.db.refresh(db_post)
-        return db_post
+        return post_ids
 
     async def delete(self, post_id: int, user_id: int) -> bool:
         """
-        Delete a post by ID if it belongs to the user.
+        Soft-delete a post by ID if it belongs to the user, with a single UPDATE statement.
+        The row is removed later by `purge_deleted`.
         Args:
             post_id (int): Post ID
             user_id (int): User ID
         Returns:
             bool: True if deleted, False if not found or not owned by user
         """
-        stmt = select(Post).filter(
-            Post.id == post_id,
-            Post.user_id == user_id
-        )
+        return await self.delete_many([post_id], user_id) > 0
+
+    async def delete_many(self, post_ids: List[int], user_id: int) -> int:
+        """
+        Soft-delete the given posts that belong to the user, with a single UPDATE statement.
+        Args:
+            post_ids (List[int]): Post IDs
+            user_id (int): User ID
+        Returns:
+            int: Number of posts deleted; IDs not found or not owned by the user are skipped
+        """
+        stmt = update(Post).where(
+            Post.id.in_(post_ids),
+            Post.user_id == user_id,
+            Post.deleted_at.is_(None)
+        ).values(deleted_at=datetime.now(UTC))
         result = await self.db.execute(stmt)
-        db_post = result.scalars().first()
-        if not db_post:
-            return False
+        await self.db.commit()
+        return result.rowcount
 
-        await self.db.delete(db_post)
+    async def purge_deleted(self, older_than: datetime, limit: int) -> int:
+        """
+        Hard-delete up to `limit` posts soft-deleted before `older_than`, in one short transaction.
+        Args:
+            older_than (datetime): Only purge posts deleted before this time
+            limit (int): Maximum number of rows to remove
+        Returns:
+            int: Number of rows removed
+        """
+        stmt = select(Post.id).where(
+            Post.deleted_at.is_not(None),
+            Post.deleted_at < older_than
+        ).order_by(Post.id).limit(limit)
+        post_ids = (await self.db.execute(stmt)).scalars().all()
+        if not post_ids:
+            return 0
+
+        result = await self.db.execute(delete(Post).where(Post.id.in_(post_ids)))
         await self.db.commit()
-        return True
+        return result.rowcount
+
+    @staticmethod
+    def _user_posts_query(
+            stmt: Select,
+            user_id: int,
+            limit: Optional[int],
+            before: Optional[Tuple[datetime, int]]
+    ) -> Select:
+        # Filters and orders so the (user_id, created_at, id) index serves the whole query
+        stmt = stmt.where(Post.user_id == user_id, Post.deleted_at.is_(None))
+        if before is not None:
+            created_at, post_id = before
+            stmt = stmt.where(or_(
+                Post.created_at < created_at,
+                and_(Post.created_at == created_at, Post.id < post_id)
+            ))
+        stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
@@ -0,0 +1,161 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.models import engine
+from app.repositories.post_repository import insert_posts
+
+logger = logging.getLogger(__name__)
+
+_PendingPost = Tuple[Dict[str, Any], asyncio.Future]
+
+
+class PostWriteBatcher:
+    """
+    Group-commit pipeline for post inserts.
+
+    Concurrent `submit` calls are collected for up to `max_delay` seconds or until `max_batch`
+    posts are waiting, then written with one multi-row INSERT and one COMMIT on a dedicated
+    connection. Each caller gets its own post ID back. If the batch fails, its posts are retried
+    one by one so that only the failing posts report an error.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_delay: float = 0.002, max_batch: int = 100):
+        """
+        Args:
+            engine (AsyncEngine): Engine the dedicated connection is taken from.
+            max_delay (float): Seconds to wait for more posts after the first one arrives.
+            max_batch (int): Maximum number of posts written in one transaction.
+        """
+        self.engine = engine
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending: List[_PendingPost] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._conn: Optional[AsyncConnection] = None
+
+        self.batches = 0
+        self.batched_posts = 0
+
+    async def submit(self, text: str, user_id: int) -> int:
+        """
+        Queue a post for the next batch and wait until it is committed.
+        Args:
+            text (str): Post text
+            user_id (int): User ID
+        Returns:
+            int: ID of the created post
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"text": text, "user_id": user_id}, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        return await future
+
+    def start(self) -> None:
+        """
+        Starts the flush worker. Called from the app lifespan; also done lazily on first use.
+        The worker runs in an empty context, so when it is started from a request it does not
+        inherit that request's context variables (e.g. its SQL tracker) for every later batch.
+        """
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def close(self) -> None:
+        """
+        Writes whatever is still queued, stops the worker and releases the dedicated connection.
+        The worker is asked to stop rather than cancelled, so a batch it is writing is not lost.
+        """
+        if self._worker is not None:
+            self._stopping = True
+            self._has_pending.set()
+            self._batch_full.set()
+            await self._worker
+            self._worker = None
+            self._stopping = False
+        while self._pending:
+            await self._flush(self._take_batch())
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"batches": self.batches, "posts": self.batched_posts, "queued": len(self._pending)}
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            await self._has_pending.wait()
+            deadline = loop.time() + self.max_delay
+            while not self._stopping and len(self._pending) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(self._take_batch())
+
+    def _take_batch(self) -> List[_PendingPost]:
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not self._pending:
+            self._has_pending.clear()
+            self._batch_full.clear()
+        return batch
+
+    async def _flush(self, batch: List[_PendingPost]) -> None:
+        batch = [(row, future) for row, future in batch if not future.done()]
+        if not batch:
+            return
+        try:
+            post_ids = await self._insert([row for row, _ in batch])
+        except Exception:
+            logger.warning("Batched insert of %d posts failed; retrying one by one", len(batch), exc_info=True)
+            for row, future in batch:
+                try:
+                    post_id = (await self._insert([row]))[0]
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    if not future.done():
+                        future.set_result(post_id)
+            return
+
+        self.batches += 1
+        self.batched_posts += len(batch)
+        for (_, future), post_id in zip(batch, post_ids):
+            if not future.done():
+                future.set_result(post_id)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        if self._conn is None or self._conn.invalidated:
+            if self._conn is not None:
+                await self._conn.close()
+            self._conn = await self.engine.connect()
+        try:
+            async with self._conn.begin():
+                return await insert_posts(self._conn, self._conn.dialect, rows)
+        except Exception:
+            # Start from a fresh connection next time in case this one is broken
+            await self._conn.close()
+            self._conn = None
+            raise
+
+
+post_write_batcher = PostWriteBatcher(
+    engine,
+    max_delay=settings.POST_WRITE_BATCH_DELAY_MS / 1000,
+    max_batch=settings.POST_WRITE_BATCH_MAX,
+)
@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.models.user import User
 from app.security import get_password_hash, verify_password
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 
 
@@ -33,6 +35,20 @@ class UserRepository:
         user = await self.db.execute(stmt)
         return user.scalars().first()
 
+    async def get_is_active(self, user_id: int) -> Optional[bool]:
+        """
+        Retrieve only the is_active flag of a user.
+
+        Args:
+            user_id (int): The unique identifier of the user.
+
+        Returns:
+            Optional[bool]: The user's is_active flag, or None if the user does not exist.
+        """
+        stmt = select(User.is_active).where(User.id == user_id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """
         Retrieve a user from the database by their email address.
@@ -56,22 +72,28 @@ class UserRepository:
             password (str): The plain-text password to be hashed and stored.
 
         Returns:
-            User: The created User object with an assigned ID and hashed password.
+            User: A detached User object with the assigned ID; the row is written with a single INSERT
+            and not read back, so server-generated timestamps are not populated.
 
         Raises:
             IntegrityError: If a user with the given email already exists.
         """
         hashed_password = await get_password_hash(password)
-        db_user = User(
+        stmt = insert(User).values(email=email, hashed_password=hashed_password, is_active=True)
+        try:
+            result = await self.db.execute(stmt)
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+
+        return User(
+            id=result.inserted_primary_key[0],
             email=email,
-            hashed_password=hashed_password
+            hashed_password=hashed_password,
+            is_active=True
         )
 
-        self.db.add(db_user)
-        await self.db.commit()
-        await self.db.refresh(db_user)
-        return db_user
-
     async def verify_credentials(self, email: str, password: str) -> Optional[User]:
         """
         Verify a user's credentials by checking the provided password against the stored hashed password.
@@ -0,0 +1,77 @@
+from typing import Any, Dict, Optional, Type
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import settings
+from app.schemas.post import PostResponse, PostsResponse, post_response_adapter, posts_response_adapter
+
+# Serializers per response model, built once and reused by every request
+_adapters: Dict[Type[BaseModel], TypeAdapter] = {
+    PostResponse: post_response_adapter,
+    PostsResponse: posts_response_adapter,
+}
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core straight to bytes instead of the stdlib json module.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+def adapter_for(model_type: Type[BaseModel]) -> TypeAdapter:
+    """
+    Get the prebuilt TypeAdapter for a response model, building it on first use.
+    Args:
+        model_type (Type[BaseModel]): Response model class
+    Returns:
+        TypeAdapter: Adapter serializing instances of the model
+    """
+    adapter = _adapters.get(model_type)
+    if adapter is None:
+        adapter = _adapters[model_type] = TypeAdapter(model_type)
+    return adapter
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Any:
+    """
+    Serialize an already valid response model straight to a JSON response.
+    FastAPI skips response_model validation for Response objects, so the model is not validated twice;
+    the route's response_model still documents the schema. With FAST_JSON off the model is returned as is.
+    Args:
+        model (BaseModel): Response model instance
+        status_code (int): HTTP status code of the response
+    Returns:
+        Any: A JSON Response, or the model itself when FAST_JSON is off
+    """
+    if not settings.FAST_JSON:
+        return model
+    return Response(adapter_for(type(model)).dump_json(model), status_code=status_code, media_type="application/json")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header value against an ETag using the weak comparison.
+    Args:
+        if_none_match (Optional[str]): Header value, e.g. ``W/"1-42", "abc"`` or ``*``
+        etag (str): Current ETag of the resource
+    Returns:
+        bool: True if the client's copy is current and 304 may be sent
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
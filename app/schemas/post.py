@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+from app.config import settings
+
 
 class PostBase(BaseModel):
     """Base schema for post data"""
@@ -46,6 +48,33 @@ class PostIDResponse(BaseModel):
     post_id: int = Field(..., description="ID of the created post")
 
 
+class PostBatchCreate(BaseModel):
+    """Schema for creating several posts at once"""
+    posts: List[PostCreate] = Field(..., min_length=1, max_length=settings.POSTS_BATCH_MAX,
+                                    description="Posts to create")
+
+
+class PostBatchDelete(BaseModel):
+    """Schema for deleting several posts at once"""
+    post_ids: List[int] = Field(..., min_length=1, max_length=settings.POSTS_BATCH_MAX,
+                                description="IDs of the posts to delete")
+
+
+class PostsDeletedResponse(BaseModel):
+    """Schema for bulk delete response"""
+    deleted: int = Field(..., description="Number of posts deleted")
+
+
+class PostIDsResponse(BaseModel):
+    """Schema for multiple post IDs response"""
+    post_ids: List[int] = Field(..., description="IDs of the created posts, in request order")
+
+
 class PostsResponse(BaseModel):
     """Schema for multiple posts response"""
     posts: List[PostResponse] = Field(..., description="List of posts")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+
+post_response_adapter = TypeAdapter(PostResponse)
+posts_response_adapter = TypeAdapter(PostsResponse)
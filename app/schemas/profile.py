@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class ProfilesResponse(BaseModel):
+    """Schema for the list of stored request profiles"""
+    profiles: List[str] = Field(..., description="Profile names, newest first")
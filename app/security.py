@@ -1,35 +1,155 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 
+from app.cache import TTLCache
 from app.config import settings
+from app.metrics import jwt_duration, password_hash_duration
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password hashing queue is full and the request should be rejected.
+    """
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification off the event loop in a bounded worker pool.
+
+    At most `workers` hashes run at once and at most `max_queue` more wait for a worker;
+    anything beyond that is rejected immediately with PasswordHasherBusy instead of
+    piling up behind bcrypt.
+    """
+
+    def __init__(self, executor: str = "thread", workers: int = 2, max_queue: int = 32):
+        """
+        Args:
+            executor (str): "thread", "process", or "inline" to hash on the event loop.
+            workers (int): Number of concurrent hashing workers.
+            max_queue (int): Number of calls allowed to wait for a worker.
+        """
+        if executor not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown password hasher executor: {executor}")
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", _verify, plain_password, hashed_password)
+
+    def start(self) -> None:
+        """
+        Creates the worker pool. Called from the app lifespan; also done lazily on first use.
+        """
+        if self._executor is not None or self.executor_kind == "inline":
+            return
+        if self.executor_kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns queue depth and hash latency figures.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_total_seconds": self.latency_total,
+            "latency_max_seconds": self.latency_max,
+        }
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many concurrent password hashing requests")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self.executor_kind == "inline":
+                return fn(*args)
+            self.start()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            self.completed += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            password_hash_duration.labels(operation).observe(elapsed)
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASHER_EXECUTOR,
+    workers=settings.PASSWORD_HASHER_WORKERS,
+    max_queue=settings.PASSWORD_HASHER_QUEUE,
+)
+
+
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verify a password against a hash.
+    Verify a password against a hash in the password hasher pool.
     Args:
         plain_password (str): The plain text password
         hashed_password (str): The hashed password
     Returns:
         bool: True if password matches, False otherwise
+    Raises:
+        PasswordHasherBusy: If the hashing queue is full
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 async def get_password_hash(password: str) -> str:
     """
-    Hash a password.
+    Hash a password in the password hasher pool.
     Args:
         password (str): The plain text password
     Returns:
         str: The hashed password
+    Raises:
+        PasswordHasherBusy: If the hashing queue is full
     """
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
 
 
 async def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -44,13 +164,20 @@ async def create_access_token(data: Dict[str, Any], expires_delta: Optional[time
     to_encode = data.copy()
     expire = datetime.now(UTC) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    start = time.perf_counter()
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    jwt_duration.labels("encode").observe(time.perf_counter() - start)
     return encoded_jwt
 
 
+# Verified token payloads keyed by token digest, each expiring with the token itself
+token_cache = TTLCache(max_entries=settings.TOKEN_CACHE_SIZE, sizeof=lambda payload: 0)
+
+
 async def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode a JWT token.
+    Tokens that verified before are served from the token cache until their own expiry.
     Args:
         token (str): The token to decode
     Returns:
@@ -58,4 +185,43 @@ async def decode_token(token: str) -> Dict[str, Any]:
     Raises:
         JWTError: If token is invalid
     """
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
\ No newline at end of file
+    if settings.TOKEN_CACHE_SIZE <= 0:
+        return _decode(token)
+
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    payload = await token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = _decode(token)
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = exp - time.time()
+        if ttl > 0:
+            await token_cache.set(digest, payload, ttl)
+    return payload
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    finally:
+        jwt_duration.labels("decode").observe(time.perf_counter() - start)
+
+
+async def purge_token_cache() -> None:
+    """
+    Forget every verified token. Call this whenever the signing key rotates.
+    """
+    await token_cache.clear()
+
+
+def warm_up() -> None:
+    """
+    Load the bcrypt backend and exercise the JWT encode/decode path once,
+    so the first login or authenticated request does not pay for lazy imports.
+    """
+    pwd_context.handler().get_backend()
+    token = jwt.encode({"sub": "warmup"}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -1,10 +1,14 @@
 from datetime import timedelta
 from typing import Optional
 
+from sqlalchemy.exc import IntegrityError
+
 from app.config import settings
+from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.security import create_access_token
 from app.schemas.auth import TokenResponse
+from app.user_liveness import user_liveness
 
 
 class AuthService:
@@ -16,28 +20,35 @@ class AuthService:
         self.repository = repository
 
     async def register_user(self, email: str, password: str) -> TokenResponse:
-
-        existing_user = await self.repository.get_by_email(email)
-        if existing_user:
+        # The unique email constraint rejects duplicates, so no lookup is needed before the INSERT
+        try:
+            user = await self.repository.create(email, password)
+        except IntegrityError:
             raise ValueError("User with this email already exists")
+        await user_liveness.mark_alive(user.id)
 
-        user = await self.repository.create(email, password)
-
-        access_token = await create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-
-        return TokenResponse(access_token=access_token)
+        return await self._issue_token(user)
 
     async def login_user(self, email: str, password: str) -> Optional[TokenResponse]:
         user = await self.repository.verify_credentials(email, password)
         if not user:
             return None
 
+        if user.is_active:
+            await user_liveness.mark_alive(user.id)
+        else:
+            await user_liveness.mark_dead(user.id)
+
+        return await self._issue_token(user)
+
+    async def _issue_token(self, user: User) -> TokenResponse:
+        claims = {"sub": str(user.id)}
+        if settings.JWT_ACTIVE_CLAIM:
+            claims["active"] = user.is_active
+
         access_token = await create_access_token(
-            data={"sub": str(user.id)},
+            data=claims,
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
 
-        return TokenResponse(access_token=access_token)
\ No newline at end of file
+        return TokenResponse(access_token=access_token)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+
+from app.config import settings
+from app.locks import FileLock
+from app.models import SessionLocal
+from app.repositories.post_repository import PostRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PostPurger:
+    """
+    Background task that hard-deletes soft-deleted posts in small chunks.
+
+    Every `interval` seconds it removes posts deleted more than `grace` seconds ago, `chunk_size` rows
+    per transaction with a short pause in between, so it never holds locks on many rows at once.
+    Every worker starts it, but only the one holding `lock` purges; the others check again every
+    `interval` seconds and take over if that worker exits.
+    """
+
+    def __init__(self, interval: int = 60, grace: int = 3600, chunk_size: int = 500, pause: float = 0.05,
+                 lock: Optional[FileLock] = None):
+        """
+        Args:
+            interval (int): Seconds between purge runs.
+            grace (int): Seconds a soft-deleted post is kept before it is purged.
+            chunk_size (int): Rows removed per transaction.
+            pause (float): Seconds to sleep between chunks.
+            lock (Optional[FileLock]): Lock deciding which worker purges; None purges in every process.
+        """
+        self.interval = interval
+        self.grace = grace
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.lock = lock
+        self._task: Optional[asyncio.Task] = None
+
+        self.purged = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.lock is not None:
+            self.lock.release()
+
+    async def purge_once(self) -> int:
+        """
+        Purges every post that is past the grace period, chunk by chunk.
+        Returns:
+            int: Number of rows removed.
+        """
+        older_than = datetime.now(UTC) - timedelta(seconds=self.grace)
+        total = 0
+        while True:
+            async with SessionLocal() as db:
+                removed = await PostRepository(db).purge_deleted(older_than, self.chunk_size)
+            total += removed
+            self.purged += removed
+            if removed < self.chunk_size:
+                return total
+            await asyncio.sleep(self.pause)
+
+    async def _run(self) -> None:
+        while True:
+            if self.lock is not None and not self.lock.acquire(blocking=False):
+                await asyncio.sleep(self.interval)
+                continue
+            try:
+                removed = await self.purge_once()
+                if removed:
+                    logger.info("Purged %d soft-deleted posts", removed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Purging soft-deleted posts failed")
+            await asyncio.sleep(self.interval)
+
+
+post_purger = PostPurger(
+    interval=settings.POST_PURGE_INTERVAL,
+    grace=settings.POST_PURGE_GRACE,
+    chunk_size=settings.POST_PURGE_CHUNK,
+    pause=settings.POST_PURGE_PAUSE_MS / 1000,
+    lock=FileLock("post-purger.lock"),
+)
@@ -1,11 +1,20 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 
 from app.repositories.post_repository import PostRepository
 from app.repositories.user_repository import UserRepository
-from app.schemas.post import PostResponse, PostIDResponse
+from app.schemas.post import (
+    PostResponse, PostIDResponse, PostIDsResponse, PostsDeletedResponse, PostsResponse, post_response_adapter,
+    posts_response_adapter
+)
+from app.models import SessionLocal
 from app.models.post import Post
-from app.cache import cache
+from app.cache_aside import cache_aside
+from app.compression import EncodedBody, encode_body
 from app.config import settings
+from app.content_versions import content_versions
+from app.pagination import encode_cursor
+from app.user_liveness import user_liveness
 
 
 class PostService:
@@ -13,15 +22,22 @@ class PostService:
     Service for handling post-related business logic, including creation, retrieval, and deletion of posts.
     """
 
-    def __init__(self, post_repository: PostRepository, user_repository: UserRepository):
+    def __init__(
+            self,
+            post_repository: PostRepository,
+            user_repository: UserRepository,
+            trusted_user_id: Optional[int] = None
+    ):
         """
         Initialize the PostService with the necessary repositories.
         Args:
             post_repository (PostRepository): Repository for post-related database operations.
             user_repository (UserRepository): Repository for user-related database operations.
+            trusted_user_id (Optional[int]): User already known to be active from the token claims.
         """
         self.post_repository = post_repository
         self.user_repository = user_repository
+        self.trusted_user_id = trusted_user_id
 
     async def create_post(self, text: str, user_id: int) -> PostIDResponse:
         """
@@ -32,41 +48,120 @@ class PostService:
         Returns:
             PostIDResponse: The ID of the created post.
         Raises:
-            ValueError: If the user does not exist.
+            ValueError: If the user does not exist or is inactive.
         """
-        user = await self.user_repository.get_by_id(user_id)
+        await self._ensure_user(user_id)
 
-        if not user:
-            raise ValueError("User not found")
+        post_id = await self.post_repository.create(text, user_id)
+        await self._posts_changed(user_id)
+        return PostIDResponse(post_id=post_id)
+
+    async def create_posts(self, texts: List[str], user_id: int) -> PostIDsResponse:
+        """
+        Create several posts for a given user in one transaction.
+        Args:
+            texts (List[str]): The contents of the posts.
+            user_id (int): The ID of the user creating the posts.
+        Returns:
+            PostIDsResponse: The IDs of the created posts, in the same order as `texts`.
+        Raises:
+            ValueError: If the user does not exist or is inactive.
+        """
+        await self._ensure_user(user_id)
+
+        post_ids = await self.post_repository.create_many(texts, user_id)
+        await self._posts_changed(user_id)
+        return PostIDsResponse(post_ids=post_ids)
 
-        post = await self.post_repository.create(text, user_id)
-        await cache.delete_pattern(f"user_posts_{user_id}")
-        return PostIDResponse(post_id=post.id)
+    async def get_posts_etag(self, user_id: int, limit: int, before: Optional[Tuple[datetime, int]] = None) -> str:
+        """
+        Build the ETag of one page of a user's posts from the user's content version, which changes
+        whenever a post is created or deleted, and the page's limit and cursor.
+        Args:
+            user_id (int): The ID of the user whose posts are versioned.
+            limit (int): Page size.
+            before (Optional[Tuple[datetime, int]]): Keyset position the page starts after.
+        Returns:
+            str: Weak ETag of the page.
+        Raises:
+            ValueError: If the user does not exist or is inactive.
+        """
+        await self._ensure_user(user_id)
+        version = await content_versions.get(user_id)
+        # Same page key as the cache, so the ETag of one page never validates another
+        return f'W/"{self._page_cache_key(str(version), user_id, limit, before)}"'
 
-    async def get_user_posts(self, user_id: int) -> List[PostResponse]:
+    async def get_user_posts(
+            self,
+            user_id: int,
+            limit: int,
+            before: Optional[Tuple[datetime, int]] = None
+    ) -> PostsResponse:
         """
-        Retrieve all posts created by a specific user.
+        Retrieve one page of posts created by a specific user, newest first.
         Args:
             user_id (int): The ID of the user whose posts are being retrieved.
+            limit (int): Maximum number of posts on the page.
+            before (Optional[Tuple[datetime, int]]): Keyset position decoded from the request cursor.
         Returns:
-            List[PostResponse]: A list of posts created by the user.
+            PostsResponse: The page of posts and the cursor of the next page.
         Raises:
-            ValueError: If the user does not exist.
+            ValueError: If the user does not exist or is inactive.
         """
-        user = await self.user_repository.get_by_id(user_id)
-        if not user:
-            raise ValueError("User not found")
+        await self._ensure_user(user_id)
+
+        return await cache_aside.get_or_load(
+            self._page_cache_key("user_posts", user_id, limit, before),
+            lambda: self._load_page(user_id, limit, before),
+            settings.CACHE_EXPIRY,
+            tags=[f"user:{user_id}"]
+        )
+
+    async def get_user_posts_json(
+            self,
+            user_id: int,
+            limit: int,
+            before: Optional[Tuple[datetime, int]] = None
+    ) -> EncodedBody:
+        """
+        Retrieve one page of posts created by a specific user as an encoded PostsResponse JSON document.
+        The encoded bytes and their gzip variant are what gets cached, so cache hits skip validation,
+        serialization and compression.
+        Args:
+            user_id (int): The ID of the user whose posts are being retrieved.
+            limit (int): Maximum number of posts on the page.
+            before (Optional[Tuple[datetime, int]]): Keyset position decoded from the request cursor.
+        Returns:
+            EncodedBody: PostsResponse encoded as JSON, with its gzip variant if it is large enough.
+        Raises:
+            ValueError: If the user does not exist or is inactive.
+        """
+        await self._ensure_user(user_id)
 
-        cache_key = f"user_posts_{user_id}"
-        cached_posts = await cache.get(cache_key)
-        if cached_posts:
-            return cached_posts
+        async def load_page_json() -> EncodedBody:
+            return encode_body(posts_response_adapter.dump_json(await self._load_page(user_id, limit, before)))
 
-        posts = await self.post_repository.get_by_user_id(user_id)
-        response_posts = [PostResponse.from_orm(post) for post in posts]
-        await cache.set(cache_key, response_posts, settings.CACHE_EXPIRY)
+        return await cache_aside.get_or_load(
+            self._page_cache_key("user_posts_encoded", user_id, limit, before),
+            load_page_json,
+            settings.CACHE_EXPIRY,
+            tags=[f"user:{user_id}"]
+        )
 
-        return response_posts
+    async def export_user_posts(self, user_id: int) -> AsyncIterator[bytes]:
+        """
+        Export every post of a specific user as NDJSON, one PostResponse per line.
+        The user is checked up front; the returned iterator reads the posts lazily through its own session,
+        because it is consumed after the request's session has been closed.
+        Args:
+            user_id (int): The ID of the user whose posts are exported.
+        Returns:
+            AsyncIterator[bytes]: NDJSON chunks.
+        Raises:
+            ValueError: If the user does not exist or is inactive.
+        """
+        await self._ensure_user(user_id)
+        return self._stream_ndjson(user_id)
 
     async def delete_post(self, post_id: int, user_id: int) -> bool:
         """
@@ -81,5 +176,55 @@ class PostService:
         """
         deleted = await self.post_repository.delete(post_id, user_id)
         if deleted:
-            await cache.delete_pattern(f"user_posts_{user_id}")
+            await self._posts_changed(user_id)
         return deleted
+
+    async def delete_posts(self, post_ids: List[int], user_id: int) -> PostsDeletedResponse:
+        """
+        Delete several posts created by a specific user in one statement.
+        Args:
+            post_ids (List[int]): The IDs of the posts to be deleted.
+            user_id (int): The ID of the user requesting the deletion.
+        Returns:
+            PostsDeletedResponse: How many posts were deleted; posts not owned by the user are skipped.
+        """
+        deleted = await self.post_repository.delete_many(post_ids, user_id)
+        if deleted:
+            await self._posts_changed(user_id)
+        return PostsDeletedResponse(deleted=deleted)
+
+    async def _posts_changed(self, user_id: int) -> None:
+        # Drop the cached pages first, so a reader seeing the new version cannot get an old page
+        await cache_aside.invalidate_tag(f"user:{user_id}")
+        await content_versions.bump(user_id)
+
+    async def _ensure_user(self, user_id: int) -> None:
+        if user_id == self.trusted_user_id:
+            return
+        if not await user_liveness.is_alive(user_id, lambda: self.user_repository.get_is_active(user_id)):
+            raise ValueError("User not found")
+
+    async def _load_page(self, user_id: int, limit: int, before: Optional[Tuple[datetime, int]]) -> PostsResponse:
+        # One extra row tells whether another page follows
+        posts = await self.post_repository.get_rows_by_user_id(user_id, limit + 1, before)
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+        return PostsResponse.model_construct(
+            posts=[PostResponse.from_orm(post) for post in posts],
+            next_cursor=next_cursor
+        )
+
+    @staticmethod
+    async def _stream_ndjson(user_id: int) -> AsyncIterator[bytes]:
+        async with SessionLocal() as db:
+            async for rows in PostRepository(db).stream_rows_by_user_id(user_id, settings.POSTS_EXPORT_CHUNK):
+                yield b"".join(
+                    post_response_adapter.dump_json(PostResponse.model_validate(row)) + b"\n" for row in rows
+                )
+
+    @staticmethod
+    def _page_cache_key(prefix: str, user_id: int, limit: int, before: Optional[Tuple[datetime, int]]) -> str:
+        cursor = encode_cursor(*before) if before else ""
+        return f"{prefix}_{user_id}_{limit}_{cursor}"
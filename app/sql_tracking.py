@@ -0,0 +1,117 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|\?|:\w+")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so that executions differing only in parameters,
+    literals or the length of IN lists and multi-row VALUES map to the same string.
+    Args:
+        statement (str): SQL as sent to the driver
+    Returns:
+        str: The statement fingerprint
+    """
+    normalized = _LITERALS.sub("?", _SPACES.sub(" ", statement).strip())
+    normalized = _LISTS.sub("(...)", normalized)
+    return _ROWS.sub("(...)", normalized)
+
+
+class RequestQueries:
+    """
+    SQL statements run on behalf of one request: count, total time and executions per fingerprint.
+    """
+    __slots__ = ("path", "count", "total_time", "fingerprints")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> str:
+        key = fingerprint(statement)
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[key] = self.fingerprints.get(key, 0) + 1
+        return key
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Fingerprints executed more than `threshold` times, most frequent first.
+        """
+        return sorted(
+            ((key, count) for key, count in self.fingerprints.items() if count > threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def server_timing(self) -> str:
+        """
+        The figures as a Server-Timing header value.
+        """
+        return f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries"'
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+class SQLTracker:
+    """
+    Cursor execution hooks attributing statements to the request in `current_queries`.
+
+    Statements run outside a tracked request (background workers, startup) are ignored.
+    Statements slower than `slow_query_seconds` are logged with their duration and fingerprint.
+    """
+
+    def __init__(self, slow_query_seconds: float):
+        """
+        Args:
+            slow_query_seconds (float): Duration from which a statement is logged as slow.
+        """
+        self.slow_query_seconds = slow_query_seconds
+
+    def install(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+
+    def uninstall(self, engine: AsyncEngine) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self._before)
+        event.remove(engine.sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if current_queries.get() is not None:
+            context._query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        queries = current_queries.get()
+        start = getattr(context, "_query_start", None)
+        if queries is None or start is None:
+            return
+        elapsed = time.perf_counter() - start
+        key = queries.record(statement, elapsed)
+        if elapsed >= self.slow_query_seconds:
+            logger.warning(
+                "Slow query duration_ms=%.1f path=%s fingerprint=%s",
+                elapsed * 1000, queries.path, key,
+                extra={"sql_duration_ms": round(elapsed * 1000, 3), "path": queries.path, "sql_fingerprint": key},
+            )
+
+
+sql_tracker = SQLTracker(slow_query_seconds=settings.SQL_SLOW_QUERY_MS / 1000)
@@ -0,0 +1,57 @@
+from typing import Awaitable, Callable, Optional
+
+from app.cache import CacheBackend, cache
+from app.config import settings
+
+
+class UserLiveness:
+    """
+    Caches whether a user exists and is active, so post requests do not fetch the user row every time.
+
+    Live users are remembered for `ttl` seconds and missing or inactive users for `negative_ttl`
+    seconds. Entries are updated directly when a user signs up or logs in. A user deactivated in the
+    database keeps being served until their entry expires, at most `ttl` seconds.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 300, negative_ttl: int = 30):
+        """
+        Args:
+            backend (CacheBackend): Where liveness entries are stored.
+            ttl (int): Seconds a live user is remembered.
+            negative_ttl (int): Seconds a missing or inactive user is remembered.
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    async def is_alive(self, user_id: int, load: Callable[[], Awaitable[Optional[bool]]]) -> bool:
+        """
+        Returns whether the user exists and is active, loading it on a cache miss.
+
+        Args:
+            user_id (int): The user ID.
+            load (Callable[[], Awaitable[Optional[bool]]]): Returns the user's is_active flag, or None if missing.
+
+        Returns:
+            bool: True if the user exists and is active.
+        """
+        alive = await self.backend.get(self._key(user_id))
+        if alive is not None:
+            return alive
+
+        alive = bool(await load())
+        await self.backend.set(self._key(user_id), alive, self.ttl if alive else self.negative_ttl)
+        return alive
+
+    async def mark_alive(self, user_id: int) -> None:
+        await self.backend.set(self._key(user_id), True, self.ttl)
+
+    async def mark_dead(self, user_id: int) -> None:
+        await self.backend.set(self._key(user_id), False, self.negative_ttl)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user_alive_{user_id}"
+
+
+user_liveness = UserLiveness(cache, ttl=settings.USER_LIVENESS_TTL, negative_ttl=settings.USER_LIVENESS_NEGATIVE_TTL)
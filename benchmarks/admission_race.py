@@ -0,0 +1,58 @@
+"""
+Checks that a queued request whose slot is handed over in the same loop iteration
+as its queue timeout fires does not leak the slot. Stalls the event loop so that
+release() and the timeout land together, then verifies every slot is accounted for.
+Exits with a non-zero status if the limiter is left with a slot nobody holds.
+
+    python -m benchmarks.admission_race
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import configure
+
+TIMEOUT = 0.05
+ROUNDS = 20
+
+
+async def race(limiter) -> bool:
+    """
+    Hold the only slot, queue a second request, then release the slot just before its timeout
+    while the loop is stalled, so the hand-over and the timeout run in the same iteration.
+    Returns:
+        bool: True if no slot leaked
+    """
+    from app.admission import AdmissionRejected
+
+    loop = asyncio.get_running_loop()
+    await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    loop.call_later(TIMEOUT / 4, time.sleep, TIMEOUT * 2)
+    loop.call_later(TIMEOUT / 2, limiter.release)
+    try:
+        await queued
+    except AdmissionRejected:
+        pass
+    else:
+        limiter.release()
+    return limiter.active == 0
+
+
+async def main() -> int:
+    configure()
+    from app.admission import ConcurrencyLimiter
+
+    limiter = ConcurrencyLimiter("GET /check", limit=1, max_queue=1, timeout=TIMEOUT)
+    leaked = 0
+    for _ in range(ROUNDS):
+        if not await race(limiter):
+            leaked += 1
+            limiter.active = 0
+    print(f"\n{'ok  ' if not leaked else 'FAIL'} slots leaked on a timeout/hand-over race: {leaked}/{ROUNDS}")
+    return 1 if leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
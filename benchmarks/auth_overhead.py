@@ -0,0 +1,42 @@
+"""
+Per-request cost of the get_token_data auth dependency with and without the verified-token cache.
+
+    python -m benchmarks.auth_overhead
+"""
+import asyncio
+from datetime import timedelta
+
+from benchmarks.common import configure, measure, report, summarize
+
+ITERATIONS = 20000
+
+
+async def main() -> None:
+    configure()
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.config import settings
+    from app.security import create_access_token, purge_token_cache
+    from dependencies import get_token_data
+
+    token = await create_access_token({"sub": "1"}, timedelta(minutes=30))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def authenticate():
+        await get_token_data(credentials)
+
+    rows = {}
+    for size in (0, 10000):
+        settings.TOKEN_CACHE_SIZE = size
+        await purge_token_cache()
+        stats = summarize(await measure(authenticate, ITERATIONS, warmup=100))
+        rows["jose decode" if size == 0 else "token cache"] = {
+            "mean_us": round(stats["mean_ms"] * 1000, 2),
+            "p99_us": round(stats["p99_ms"] * 1000, 2),
+        }
+
+    report("get_token_data per request", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""
+Cost of invalidating one user's entries in a cache holding 1M keys:
+substring scan over every key versus the tag reverse index.
+
+    python -m benchmarks.cache_invalidation
+"""
+import asyncio
+import time
+
+from benchmarks.common import configure
+
+KEYS = 1_000_000
+USERS = 100_000
+
+
+async def main() -> None:
+    configure()
+    from app.cache import TTLCache
+
+    cache = TTLCache(max_entries=KEYS + 1, max_bytes=1 << 40, sizeof=lambda value: 0)
+    for i in range(KEYS):
+        user_id = i % USERS
+        await cache.set(f"user_posts_{user_id}_page_{i}", i, 3600, tags=[f"user:{user_id}"])
+
+    start = time.perf_counter()
+    scanned = [k for k in cache._cache.keys() if "user_posts_1_" in k]
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    deleted = await cache.invalidate_tag("user:1")
+    tag_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\nInvalidate one user in a {KEYS:,}-key cache")
+    print(f"  substring scan    {scan_ms:10.3f} ms  ({len(scanned)} keys matched)")
+    print(f"  invalidate_tag    {tag_ms:10.3f} ms  ({deleted} keys deleted)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
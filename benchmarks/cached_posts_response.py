@@ -0,0 +1,46 @@
+"""
+Cache-hit latency of GET /api/v1/posts when caching PostResponse models
+(re-validated and re-serialized through response_model on every hit)
+versus caching the encoded JSON bytes, for full pages of several sizes.
+Responses are requested uncompressed so both modes send the same bytes.
+
+    python -m benchmarks.cached_posts_response
+"""
+import asyncio
+
+from benchmarks.common import client, configure, measure, report, seed_posts, signup, summarize, user_id_of
+
+PAGE_SIZES = (10, 100, 1000)  # `limit` of each request
+ITERATIONS = 300
+
+
+async def main() -> None:
+    # Raise the page size cap so the largest pages, where re-serialization costs most, can be requested
+    configure(POSTS_MAX_PAGE_SIZE=str(max(PAGE_SIZES)))
+    from app.config import settings
+
+    async with client() as http:
+        rows = {}
+        for size in PAGE_SIZES:
+            headers = await signup(http, f"bench{size}@example.com")
+            # One post more than the page, so every page is full and has a next cursor
+            await seed_posts(user_id_of(headers), size + 1)
+
+            async def get_posts():
+                response = await http.get("/api/v1/posts", params={"limit": size},
+                                          headers={**headers, "Accept-Encoding": "identity"})
+                response.raise_for_status()
+                return response
+
+            for mode in (False, True):
+                settings.CACHE_RESPONSE_BYTES = mode
+                if len((await get_posts()).json()["posts"]) != size:
+                    raise SystemExit(f"Expected full pages of {size} posts")
+                label = f"{size}-post page, {'json bytes' if mode else 'models'}"
+                rows[label] = summarize(await measure(get_posts, ITERATIONS))
+
+    report("GET /api/v1/posts cache hits", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
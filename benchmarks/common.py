@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs the ASGI app in-process against a throwaway SQLite database,
+so `configure()` must be called before anything from `app` is imported.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+BENCH_PASSWORD = "Benchmark123"
+
+
+def configure(db_url: Optional[str] = None, **overrides: str) -> str:
+    """
+    Point the application settings at a fresh SQLite file, or at `db_url` when given.
+    Args:
+        db_url (Optional[str]): Existing database to use, e.g. a local MySQL or a seeded SQLite file
+        **overrides: Extra settings to export as environment variables
+    Returns:
+        str: Path of the SQLite database file, or `db_url`
+    """
+    if db_url:
+        location = os.environ["DB_URL"] = db_url
+    else:
+        location = os.path.join(tempfile.mkdtemp(prefix="fastapi_mvc_bench_"), "bench.db")
+        os.environ["DB_URL"] = f"sqlite+aiosqlite:///{location}"
+    # Every benchmark request comes from the same client, so the per-client login/signup limit is off
+    os.environ.setdefault("AUTH_RATE_LIMIT_PER_MINUTE", "0")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+    return location
+
+
+@asynccontextmanager
+async def client() -> AsyncIterator:
+    """
+    Run the application lifespan and yield an httpx client bound to the ASGI app.
+    """
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            yield http
+
+
+async def signup(http, email: str = "bench@example.com") -> Dict[str, str]:
+    """
+    Register a user and return the authorization headers for it.
+    """
+    response = await http.post("/api/v1/auth/signup", json={"email": email, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def user_id_of(headers: Dict[str, str]) -> int:
+    """
+    Extract the user ID from authorization headers returned by `signup`.
+    """
+    from jose import jwt
+
+    return int(jwt.get_unverified_claims(headers["Authorization"].split()[1])["sub"])
+
+
+async def seed_posts(user_id: int, count: int, chunk: int = 10000) -> None:
+    """
+    Insert `count` posts for a user with chunked executemany INSERTs.
+    """
+    from sqlalchemy import insert
+
+    from app.models import SessionLocal
+    from app.models.post import Post
+
+    async with SessionLocal() as db:
+        for offset in range(0, count, chunk):
+            rows = [{"text": f"post {i}", "user_id": user_id} for i in range(offset, min(count, offset + chunk))]
+            await db.execute(insert(Post), rows)
+        await db.commit()
+
+
+async def measure(call: Callable[[], Awaitable], iterations: int, warmup: int = 10) -> List[float]:
+    """
+    Await `call` repeatedly and collect per-call latencies in milliseconds.
+    """
+    for _ in range(warmup):
+        await call()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: List[float], concurrency: int = 1) -> Dict[str, float]:
+    """
+    Reduce latencies to mean/p50/p95/p99 and requests per second at the given concurrency.
+    """
+    ordered = sorted(timings)
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    mean = statistics.fmean(ordered)
+    return {
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(pct(0.50), 4),
+        "p95_ms": round(pct(0.95), 4),
+        "p99_ms": round(pct(0.99), 4),
+        "rps": round(concurrency * 1000 / mean, 1) if mean else 0.0,
+    }
+
+
+def report(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """
+    Print a small aligned table of summaries.
+    """
+    print(f"\n{title}")
+    for name, stats in rows.items():
+        cells = "  ".join(f"{k}={v}" for k, v in stats.items())
+        print(f"  {name:<32} {cells}")
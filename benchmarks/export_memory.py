@@ -0,0 +1,83 @@
+"""
+Peak RSS growth while streaming GET /api/v1/posts/export for small and large post histories.
+The ASGI app is driven directly so response bytes are counted and dropped, never buffered.
+
+    python -m benchmarks.export_memory
+"""
+import asyncio
+import gc
+import os
+import time
+
+from benchmarks.common import client, configure, seed_posts, signup, user_id_of
+
+SIZES = (1_000, 300_000)
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def export(app, authorization: str) -> int:
+    """
+    Run one export request through the ASGI app and return the number of body bytes sent.
+    """
+    received = asyncio.Event()
+    sent = 0
+
+    async def receive():
+        if not received.is_set():
+            received.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/v1/posts/export", "raw_path": b"/api/v1/posts/export", "query_string": b"", "root_path": "",
+        "headers": [(b"authorization", authorization.encode())], "client": ("bench", 1), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+async def main() -> None:
+    configure()
+    from app.main import app
+
+    async with client() as http:
+        print("\nGET /api/v1/posts/export")
+        for size in SIZES:
+            headers = await signup(http, f"bench{size}@example.com")
+            await seed_posts(user_id_of(headers), size)
+            gc.collect()
+
+            baseline = peak = rss_bytes()
+            done = asyncio.Event()
+
+            async def sample():
+                nonlocal peak
+                while not done.is_set():
+                    peak = max(peak, rss_bytes())
+                    await asyncio.sleep(0.005)
+
+            sampler = asyncio.create_task(sample())
+            start = time.perf_counter()
+            sent = await export(app, headers["Authorization"])
+            elapsed = time.perf_counter() - start
+            done.set()
+            await sampler
+
+            print(f"  {size:>9,} posts  {sent / 2**20:8.1f} MiB streamed in {elapsed:6.2f}s  "
+                  f"peak RSS growth {(peak - baseline) / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
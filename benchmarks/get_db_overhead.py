@@ -0,0 +1,46 @@
+"""
+Per-request cost of running create_all inside get_db versus the lifespan-managed schema.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.get_db_overhead
+"""
+import asyncio
+
+from benchmarks.common import client, configure, measure, report, signup, summarize
+
+ITERATIONS = 500
+
+
+async def main() -> None:
+    configure()
+    from app.main import app
+    from app.models import Base, SessionLocal, engine, get_db
+
+    async def legacy_get_db():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    async with client() as http:
+        headers = await signup(http)
+        await http.post("/api/v1/posts", json={"text": "hello"}, headers=headers)
+
+        async def get_posts():
+            response = await http.get("/api/v1/posts", headers=headers)
+            response.raise_for_status()
+
+        app.dependency_overrides[get_db] = legacy_get_db
+        before = summarize(await measure(get_posts, ITERATIONS))
+        app.dependency_overrides.clear()
+        after = summarize(await measure(get_posts, ITERATIONS))
+
+    report("GET /api/v1/posts", {"create_all per request": before, "lifespan schema": after})
+    print(f"\n  saving per request: {before['mean_ms'] - after['mean_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Throughput of the JSON endpoints with FAST_JSON off (response_model validation
+plus jsonable_encoder and json.dumps) versus on (prebuilt TypeAdapters dumping
+straight to bytes). The auth endpoints are left out as bcrypt dominates them.
+
+    python -m benchmarks.json_throughput
+"""
+import asyncio
+
+from benchmarks.common import client, configure, measure, report, seed_posts, signup, summarize, user_id_of
+
+PAGE_SIZE = 100
+BATCH_SIZE = 50
+ITERATIONS = 300
+
+
+async def main() -> None:
+    # The default response class is picked at import, so start from the stock JSONResponse and toggle per run
+    configure(CACHE_RESPONSE_BYTES=False, FAST_JSON=False)
+    from app.config import settings
+
+    async with client() as http:
+        headers = await signup(http, "bench@example.com")
+        await seed_posts(user_id_of(headers), PAGE_SIZE)
+
+        async def get_posts():
+            response = await http.get("/api/v1/posts", params={"limit": PAGE_SIZE}, headers=headers)
+            response.raise_for_status()
+
+        async def add_post():
+            response = await http.post("/api/v1/posts", json={"text": "benchmark"}, headers=headers)
+            response.raise_for_status()
+
+        batch = {"posts": [{"text": "benchmark"}] * BATCH_SIZE}
+
+        async def add_posts():
+            response = await http.post("/api/v1/posts/batch", json=batch, headers=headers)
+            response.raise_for_status()
+
+        async def delete_posts():
+            response = await http.request("DELETE", "/api/v1/posts", json={"post_ids": [0]}, headers=headers)
+            response.raise_for_status()
+
+        endpoints = {
+            f"GET /posts ({PAGE_SIZE}, cache hit)": get_posts,
+            "POST /posts": add_post,
+            f"POST /posts/batch ({BATCH_SIZE})": add_posts,
+            "DELETE /posts": delete_posts,
+        }
+        rows = {}
+        for name, fn in endpoints.items():
+            for mode in (False, True):
+                settings.FAST_JSON = mode
+                rows[f"{name}, {'fast' if mode else 'default'}"] = summarize(await measure(fn, ITERATIONS))
+
+    report("JSON response serialization", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,289 @@
+"""
+Load test of the API endpoints against a seeded dataset, with a comparison
+command that flags regressions between two result files.
+
+Each scenario runs `--concurrency` clients in-process. Per-request setup (picking a
+user, invalidating its cached page, creating the post to delete) is not timed.
+Requests per second are derived from the mean latency and the concurrency. Every
+scenario runs `--repeat` times and the median of each metric is reported.
+
+    python -m benchmarks.load run --users 10000 --posts-per-user 20 --output before.json
+    python -m benchmarks.load run --users 10000 --posts-per-user 20 --output after.json
+    python -m benchmarks.load compare before.json after.json --threshold 0.15
+
+`run --db-url ... --skip-seed` reuses a database prepared with `python -m benchmarks.dataset`.
+`compare` exits with a non-zero status if any shared scenario regressed past the threshold.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.common import BENCH_PASSWORD, client, configure, report, summarize
+
+WARMUP = 5
+# metric -> True if higher is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+
+
+async def run_scenario(
+        prepare: Callable[[int], Awaitable[Any]],
+        request: Callable[[Any], Awaitable[None]],
+        iterations: int,
+        concurrency: int,
+) -> Dict[str, float]:
+    """
+    Run `iterations` requests spread over `concurrency` concurrent clients.
+    Args:
+        prepare (Callable[[int], Awaitable[Any]]): Untimed setup, given the iteration number
+        request (Callable[[Any], Awaitable[None]]): Timed request, given what `prepare` returned
+        iterations (int): Number of timed requests
+        concurrency (int): Number of concurrent clients
+    Returns:
+        Dict[str, float]: Latency percentiles and requests per second
+    """
+    for i in range(WARMUP):
+        await request(await prepare(-1 - i))
+
+    counter = itertools.count()
+    timings: List[float] = []
+
+    async def worker():
+        while (i := next(counter)) < iterations:
+            args = await prepare(i)
+            start = time.perf_counter()
+            await request(args)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(timings, concurrency)
+
+
+def _expect(response, status_code: int) -> None:
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path}: "
+                           f"expected {status_code}, got {response.status_code} {response.text[:200]}")
+
+
+async def _bench_users(limit: int) -> List[Dict[str, Any]]:
+    from sqlalchemy import select
+
+    from app.models import engine
+    from app.models.user import User
+
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(User.id, User.email).where(User.email.like("%@bench.example.com")).order_by(User.id).limit(limit)
+        )
+        return [{"id": row.id, "email": row.email} for row in result]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    location = configure(db_url=args.db_url, CACHE_BACKEND="memory")
+    from sqlalchemy import insert
+
+    from app.cache_aside import cache_aside
+    from app.models import engine
+    from app.models.post import Post
+    from app.security import create_access_token
+
+    if not args.skip_seed:
+        from benchmarks.dataset import seed_dataset
+
+        start = time.perf_counter()
+        await seed_dataset(args.users, args.posts_per_user, args.seed)
+        print(f"seeded {args.users} users x {args.posts_per_user} posts in {time.perf_counter() - start:.1f}s")
+
+    users = await _bench_users(max(args.iterations + WARMUP, args.concurrency))
+    if not users:
+        raise SystemExit("No benchmark users found; seed the database with benchmarks.dataset first")
+    for user in users:
+        token = await create_access_token({"sub": str(user["id"])})
+        user["headers"] = {"Authorization": f"Bearer {token}"}
+    hot_user = users[0]
+    signups = itertools.count()
+
+    async with client() as http:
+        async def nothing(i: int) -> None:
+            return None
+
+        async def next_email(i: int) -> str:
+            return f"load{next(signups)}-{os.getpid()}@example.com"
+
+        async def signup(email: str) -> None:
+            response = await http.post("/api/v1/auth/signup", json={"email": email, "password": BENCH_PASSWORD})
+            _expect(response, 201)
+
+        async def login(_) -> None:
+            response = await http.post("/api/v1/auth/login",
+                                       json={"email": hot_user["email"], "password": BENCH_PASSWORD})
+            _expect(response, 200)
+
+        async def any_user(i: int) -> Dict[str, Any]:
+            return users[i % len(users)]
+
+        async def create_post(user: Dict[str, Any]) -> None:
+            response = await http.post("/api/v1/posts", json={"text": "load test"}, headers=user["headers"])
+            _expect(response, 201)
+
+        async def hot(i: int) -> Dict[str, Any]:
+            return hot_user
+
+        async def cold_user(i: int) -> Dict[str, Any]:
+            user = users[i % len(users)]
+            await cache_aside.invalidate_tag(f"user:{user['id']}")
+            return user
+
+        async def get_posts(user: Dict[str, Any]) -> None:
+            response = await http.get("/api/v1/posts", headers=user["headers"])
+            _expect(response, 200)
+
+        async def current_etag(i: int) -> Dict[str, str]:
+            response = await http.get("/api/v1/posts", headers=hot_user["headers"])
+            return {**hot_user["headers"], "If-None-Match": response.headers["etag"]}
+
+        async def revalidate(headers: Dict[str, str]) -> None:
+            response = await http.get("/api/v1/posts", headers=headers)
+            _expect(response, 304)
+
+        async def new_post(i: int) -> Dict[str, Any]:
+            user = users[i % len(users)]
+            async with engine.begin() as conn:
+                result = await conn.execute(insert(Post).values(text="to delete", user_id=user["id"]))
+            return {"headers": user["headers"], "post_id": result.inserted_primary_key[0]}
+
+        async def delete_post(target: Dict[str, Any]) -> None:
+            response = await http.delete(f"/api/v1/posts/{target['post_id']}", headers=target["headers"])
+            _expect(response, 204)
+
+        scenarios = {
+            "POST /auth/signup": (next_email, signup, args.auth_iterations),
+            "POST /auth/login": (nothing, login, args.auth_iterations),
+            "POST /posts": (any_user, create_post, args.iterations),
+            "GET /posts (cache miss)": (cold_user, get_posts, args.iterations),
+            "GET /posts (cache hit)": (hot, get_posts, args.iterations),
+            "GET /posts (not modified)": (current_etag, revalidate, args.iterations),
+            "DELETE /posts/{id}": (new_post, delete_post, args.iterations),
+        }
+        results = {}
+        for name, (prepare, request, iterations) in scenarios.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            runs = [await run_scenario(prepare, request, iterations, args.concurrency) for _ in range(args.repeat)]
+            results[name] = {metric: statistics.median(r[metric] for r in runs) for metric in runs[0]}
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "location": location if args.db_url is None else engine.url.render_as_string(hide_password=True),
+            "users": args.users,
+            "posts_per_user": args.posts_per_user,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "auth_iterations": args.auth_iterations,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare two result files and print the relative change of every metric.
+    Args:
+        baseline (Dict[str, Any]): Results of the reference run
+        current (Dict[str, Any]): Results of the run being checked
+        threshold (float): Relative change that counts as a regression, e.g. 0.15 for 15%
+    Returns:
+        List[str]: Descriptions of the regressions found
+    """
+    regressions = []
+    print(f"\nbaseline {baseline['meta'].get('commit')}  vs  current {current['meta'].get('commit')}")
+    for name, stats in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"  {name:<32} new scenario, nothing to compare")
+            continue
+        cells = []
+        for metric, higher_is_better in METRICS.items():
+            if not base.get(metric):
+                continue
+            change = (stats[metric] - base[metric]) / base[metric]
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = " !"
+                regressions.append(f"{name} {metric}: {base[metric]} -> {stats[metric]} ({change:+.1%})")
+            cells.append(f"{metric}={stats[metric]} ({change:+.1%}){flag}")
+        print(f"  {name:<32} " + "  ".join(cells))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the API and compare runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed a database, load test every endpoint and save the results")
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--posts-per-user", type=int, default=20)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--iterations", type=int, default=500)
+    run_parser.add_argument("--auth-iterations", type=int, default=20, help="Iterations of the bcrypt-bound endpoints")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median of each metric is kept")
+    run_parser.add_argument("--db-url", help="Database to use instead of a fresh SQLite file")
+    run_parser.add_argument("--skip-seed", action="store_true", help="Use the users already in --db-url")
+    run_parser.add_argument("--only", nargs="*", help="Run only scenarios whose name contains one of these")
+    run_parser.add_argument("--output", default="benchmarks/results/latest.json")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        results = asyncio.run(run(args))
+        report("Load test", results["results"])
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
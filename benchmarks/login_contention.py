@@ -0,0 +1,94 @@
+"""
+GET /api/v1/posts latency while /auth/login is under concurrent load,
+with bcrypt on the event loop ("inline") versus in the password hasher pool.
+
+GETs are sent on a fixed wall-clock schedule and each latency is measured from the time
+the request was due, not from when the event loop got round to sending it. Time the loop
+spends blocked inside an inline bcrypt call therefore counts against the GETs waiting behind it.
+
+    python -m benchmarks.login_contention
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.common import BENCH_PASSWORD, client, configure, report, signup, summarize
+
+ITERATIONS = 100
+INTERVAL = 0.02  # seconds between scheduled GETs
+LOGIN_CONCURRENCY = 4
+
+
+async def measure_on_schedule(call: Callable[[], Awaitable], iterations: int, interval: float) -> List[float]:
+    """
+    Start `call` every `interval` seconds and collect latencies in milliseconds from each scheduled start.
+    """
+    loop = asyncio.get_running_loop()
+    timings: List[float] = []
+
+    async def timed(due: float) -> None:
+        await call()
+        timings.append((loop.time() - due) * 1000)
+
+    start = loop.time() + interval
+    tasks = []
+    for i in range(iterations):
+        due = start + i * interval
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        tasks.append(asyncio.create_task(timed(due)))
+    await asyncio.gather(*tasks)
+    return timings
+
+
+def latencies(timings: List[float]) -> Dict[str, float]:
+    # The request rate is fixed by the schedule, so only the latency figures are meaningful
+    return {key: value for key, value in summarize(timings).items() if key != "rps"}
+
+
+async def main() -> None:
+    configure()
+    from app.security import password_hasher
+
+    async with client() as http:
+        headers = await signup(http)
+        await http.post("/api/v1/posts", json={"text": "hello"}, headers=headers)
+        credentials = {"email": "bench@example.com", "password": BENCH_PASSWORD}
+        logins = {"count": 0}
+
+        async def get_posts():
+            response = await http.get("/api/v1/posts", headers=headers)
+            response.raise_for_status()
+
+        async def login_loop(stop: asyncio.Event):
+            while not stop.is_set():
+                response = await http.post("/api/v1/auth/login", json=credentials)
+                response.raise_for_status()
+                logins["count"] += 1
+
+        for _ in range(10):
+            await get_posts()
+        rows = {"idle": latencies(await measure_on_schedule(get_posts, ITERATIONS, INTERVAL))}
+        for kind in ("inline", "thread", "process"):
+            password_hasher.shutdown()
+            password_hasher.executor_kind = kind
+            password_hasher.start()
+            stop = asyncio.Event()
+            logins["count"] = 0
+            tasks = [asyncio.create_task(login_loop(stop)) for _ in range(LOGIN_CONCURRENCY)]
+            await asyncio.sleep(0.2)
+            started = time.perf_counter()
+            timings = await measure_on_schedule(get_posts, ITERATIONS, INTERVAL)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await asyncio.gather(*tasks)
+            rows[f"{LOGIN_CONCURRENCY} logins, {kind}"] = {
+                **latencies(timings), "logins_per_s": round(logins["count"] / elapsed, 1)
+            }
+
+    report("GET /api/v1/posts latency under login load (open loop, "
+           f"one GET every {INTERVAL * 1000:.0f} ms)", rows)
+    print(f"\n  password hasher: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
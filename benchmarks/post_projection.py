@@ -0,0 +1,52 @@
+"""
+Rows per second when listing a user's posts as ORM entities versus column projections.
+
+    python -m benchmarks.post_projection
+"""
+import asyncio
+import time
+
+from benchmarks.common import client, configure, seed_posts, signup, user_id_of
+
+SIZES = (10_000, 100_000)
+ROUNDS = 5
+
+
+async def rows_per_second(load, expected: int) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        rows = await load()
+        best = min(best, time.perf_counter() - start)
+        assert len(rows) == expected
+    return expected / best
+
+
+async def main() -> None:
+    configure()
+    from app.models import SessionLocal
+    from app.repositories.post_repository import PostRepository
+
+    async with client() as http:
+        print("\nListing all posts of one user")
+        for size in SIZES:
+            user_id = user_id_of(await signup(http, f"bench{size}@example.com"))
+            await seed_posts(user_id, size)
+
+            async with SessionLocal() as db:
+                repository = PostRepository(db)
+
+                async def load_entities():
+                    posts = await repository.get_by_user_id(user_id)
+                    db.expunge_all()
+                    return posts
+
+                entities = await rows_per_second(load_entities, size)
+                projection = await rows_per_second(lambda: repository.get_rows_by_user_id(user_id), size)
+
+            print(f"  {size:>7,} posts  ORM entities {entities:>12,.0f} rows/s  "
+                  f"projection {projection:>12,.0f} rows/s  ({projection / entities:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Checks that every endpoint issues the minimum number of SQL statements.
+Exits with a non-zero status if any endpoint issues more than expected.
+
+    python -m benchmarks.query_counts
+"""
+import asyncio
+import sys
+from datetime import UTC, datetime
+
+from benchmarks.common import BENCH_PASSWORD, client, configure
+
+# endpoint -> (expected statements, expected commits)
+EXPECTED = {
+    "POST /auth/signup": (1, 1),
+    "POST /auth/signup (duplicate)": (1, 0),
+    "POST /auth/login": (1, 0),
+    "POST /posts": (1, 1),
+    "GET /posts (cache miss)": (1, 0),
+    "GET /posts (cache hit)": (0, 0),
+    "GET /posts (not modified)": (0, 0),
+    "GET /posts (other limit, stale etag)": (1, 0),
+    "GET /posts (other cursor, stale etag)": (1, 0),
+    "DELETE /posts/{id}": (1, 1),
+}
+
+
+async def main() -> int:
+    configure(POST_PURGE_ENABLED=False)
+    from sqlalchemy import event
+
+    from app.models import engine
+    from app.pagination import encode_cursor
+
+    statements, commits = [], []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(conn))
+
+    credentials = {"email": "bench@example.com", "password": BENCH_PASSWORD}
+    observed = {}
+
+    async with client() as http:
+        async def count(name: str, method: str, url: str, expected_status: int, **kwargs):
+            statements.clear()
+            commits.clear()
+            response = await http.request(method, f"/api/v1{url}", **kwargs)
+            assert response.status_code == expected_status, (name, response.status_code, response.text)
+            observed[name] = (len(statements), len(commits), list(statements))
+            return response
+
+        response = await count("POST /auth/signup", "POST", "/auth/signup", 201, json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await count("POST /auth/signup (duplicate)", "POST", "/auth/signup", 409, json=credentials)
+        await count("POST /auth/login", "POST", "/auth/login", 200, json=credentials)
+        response = await count("POST /posts", "POST", "/posts", 201, json={"text": "hello"}, headers=headers)
+        post_id = response.json()["post_id"]
+        await count("GET /posts (cache miss)", "GET", "/posts", 200, headers=headers)
+        response = await count("GET /posts (cache hit)", "GET", "/posts", 200, headers=headers)
+        stale = {**headers, "If-None-Match": response.headers["etag"]}
+        await count("GET /posts (not modified)", "GET", "/posts", 304, headers=stale)
+        # The ETag of one page must not validate another
+        await count("GET /posts (other limit, stale etag)", "GET", "/posts", 200, params={"limit": 1}, headers=stale)
+        await count("GET /posts (other cursor, stale etag)", "GET", "/posts", 200,
+                    params={"cursor": encode_cursor(datetime.now(UTC), post_id + 1)}, headers=stale)
+        await count("DELETE /posts/{id}", "DELETE", f"/posts/{post_id}", 204, headers=headers)
+
+    failed = False
+    print("\nSQL statements per request")
+    for name, (expected_statements, expected_commits) in EXPECTED.items():
+        statement_count, commit_count, sql = observed[name]
+        ok = statement_count <= expected_statements and commit_count <= expected_commits
+        failed |= not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {name:<40} statements={statement_count}/{expected_statements} "
+              f"commits={commit_count}/{expected_commits}")
+        if not ok:
+            for stmt in sql:
+                print(f"         {' '.join(stmt.split())}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
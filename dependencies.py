@@ -1,15 +1,17 @@
 
-from fastapi import Depends, HTTPException, status, Header, Request
+from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from jose import JWTError
 from typing import Optional, Dict, Any
 
 from app.models import get_db
+from app.profiler import verify_profile_token
 from app.security import decode_token
 from app.config import settings
 from app.repositories.user_repository import UserRepository
 from app.repositories.post_repository import PostRepository
+from app.repositories.post_write_batcher import post_write_batcher
 from app.services.auth_service import AuthService
 from app.services.post_service import PostService
 
@@ -36,36 +38,10 @@ async def get_post_repository(db: Session = Depends(get_db)) -> PostRepository:
     Returns:
         PostRepository: Post repository instance
     """
-    return PostRepository(db)
-
-
-# Service dependencies
-async def get_auth_service(repo: UserRepository = Depends(get_user_repository)) -> AuthService:
-    """
-    Get auth service instance.
-    Args:
-        repo (UserRepository): User repository
-    Returns:
-        AuthService: Auth service instance
-    """
-    return AuthService(repo)
-
-
-async def get_post_service(
-        post_repo: PostRepository = Depends(get_post_repository),
-        user_repo: UserRepository = Depends(get_user_repository)
-) -> PostService:
-    """
-    Get post service instance.
-    Args:
-        post_repo (PostRepository): Post repository
-        user_repo (UserRepository): User repository
-    Returns:
-        PostService: Post service instance
-    """
-    return PostService(post_repo, user_repo)
+    return PostRepository(db, post_write_batcher if settings.POST_WRITE_BATCHING else None)
 
 
+# Auth dependencies
 async def get_token_data(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """
     Get and validate token data.
@@ -86,7 +62,7 @@ async def get_token_data(credentials: HTTPAuthorizationCredentials = Depends(sec
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return {"user_id": user_id, "token": token}
+        return {"user_id": user_id, "token": token, "active": payload.get("active")}
     except JWTError:
 
         raise HTTPException(
@@ -96,6 +72,38 @@ async def get_token_data(credentials: HTTPAuthorizationCredentials = Depends(sec
         )
 
 
+# Service dependencies
+async def get_auth_service(repo: UserRepository = Depends(get_user_repository)) -> AuthService:
+    """
+    Get auth service instance.
+    Args:
+        repo (UserRepository): User repository
+    Returns:
+        AuthService: Auth service instance
+    """
+    return AuthService(repo)
+
+
+async def get_post_service(
+        post_repo: PostRepository = Depends(get_post_repository),
+        user_repo: UserRepository = Depends(get_user_repository),
+        token_data: Dict[str, Any] = Depends(get_token_data)
+) -> PostService:
+    """
+    Get post service instance.
+    Args:
+        post_repo (PostRepository): Post repository
+        user_repo (UserRepository): User repository
+        token_data (Dict[str, Any]): Token data
+    Returns:
+        PostService: Post service instance
+    """
+    trusted_user_id = None
+    if settings.JWT_ACTIVE_CLAIM and token_data["active"] is True:
+        trusted_user_id = int(token_data["user_id"])
+    return PostService(post_repo, user_repo, trusted_user_id)
+
+
 async def get_current_user_id(token_data: Dict[str, Any] = Depends(get_token_data)) -> int:
     """
     Get current user ID from token data
@@ -107,17 +115,16 @@ async def get_current_user_id(token_data: Dict[str, Any] = Depends(get_token_dat
     return int(token_data["user_id"])
 
 
-async def validate_payload_size(request: Request):
+async def require_profiler_access(x_profile: Optional[str] = Header(None)) -> None:
     """
-    Validate that request payload doesn't exceed maximum size.
+    Allow access to the profiler endpoints only with a valid signed X-Profile header.
     Args:
-        request (Request): FastAPI request object
+        x_profile (Optional[str]): Token created with `python -m app.profiler`
     Raises:
-        HTTPException: If payload size exceeds maximum
+        HTTPException: If the header is missing, expired or wrongly signed
     """
-    content_length = request.headers.get("content-length")
-    if content_length and int(content_length) > settings.MAX_PAYLOAD_SIZE:
+    if not x_profile or not verify_profile_token(settings.PROFILER_SECRET, x_profile):
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"Payload too large. Maximum size is {settings.MAX_PAYLOAD_SIZE} bytes"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid profiler token"
         )
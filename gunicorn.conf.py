@@ -0,0 +1,24 @@
+"""
+Gunicorn hooks for aggregating metrics across workers.
+
+With METRICS_MULTIPROCESS=true and PROMETHEUS_MULTIPROC_DIR pointing at an empty
+writable directory, every worker writes its metrics there and /metrics sums them.
+"""
+import glob
+import os
+
+
+def on_starting(server):
+    # Values left over from a previous run would be added to the new ones
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)